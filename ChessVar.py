@@ -1,759 +1,1527 @@
-# Author: Colin Sonnenberg
-# GitHub username: sonnenco
-# Description: A project drafted to meet the requirements of the portfolio-project for CS162 at Oregon State University.
-
-from termcolor import colored, cprint
-
-class ChessVar:
-    """An abstract board game that is a variant of chess called 'atomic chess.'
-    See README.md for long-description of the game's requirements."""
-
-    def __init__(self):
-        """
-        Initialization method for the match of atomic chess.
-        """
-        self._board = []
-        self._game_state = 'UNFINISHED'
-        self._list_of_columns = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
-        self._list_of_rows = [1, 2, 3, 4, 5, 6, 7, 8]
-        self._player_turn = 'white'
-
-        # Create blank lists which will be filled with the starting front and back rows for each side.
-        initial_black_back, initial_black_front, initial_white_back, initial_white_front = ([] for _ in range(4))
-
-        # Dictionary which stores the order of the front + back rows of pieces for white and black
-        map_of_pieces = {
-            1: Rook,
-            2: Knight,
-            3: Bishop,
-            4: Queen,
-            5: King,
-            6: Bishop,
-            7: Knight,
-            8: Rook
-        }
-
-        # Generates the front and back rows using map_of_pieces
-        colors = ['black', 'white']
-        for color in colors:
-            for index in range(8):
-                column = index + 1
-                if color == 'black':
-                    initial_black_front.append(Pawn(color, self._list_of_columns[index] + '7'))
-                    type_of_piece = map_of_pieces[column]
-                    initial_black_back.append(type_of_piece(color, self._list_of_columns[index] + '8'))
-                if color == 'white':
-                    initial_white_front.append(Pawn(color, self._list_of_columns[index] + '2'))
-                    type_of_piece = map_of_pieces[column]
-                    initial_white_back.append(type_of_piece(color, self._list_of_columns[index] + '1'))
-
-        # Fills out the starting board using the respective variables filled above
-        self._board = [
-            initial_black_back,
-            initial_black_front,
-            ['.', '.', '.', '.', '.', '.', '.', '.'],
-            ['.', '.', '.', '.', '.', '.', '.', '.'],
-            ['.', '.', '.', '.', '.', '.', '.', '.'],
-            ['.', '.', '.', '.', '.', '.', '.', '.'],
-            initial_white_front,
-            initial_white_back
-        ]
-
-    def get_game_state(self):
-        """
-        Returns the game_state private data member initialized and tracked in this ChessVar object.
-        """
-        return self._game_state
-
-    def get_player_turn(self):
-        """
-        Returns the player_turn private data member initialized and tracked in this ChessVar object.
-        """
-        return self._player_turn
-
-    def make_move(self, current_position, requested_position):
-        """
-        Allows the player to make permissible moves on the atomic chess board.
-        Unlike standard chess, there is no check or checkmate, no castling, en passant, or pawn promotion.
-        :param current_position: Algebraic notation of a piece which the player would like to move.
-        :param requested_position: Algebraic notation of a location the player would like to move the piece to.
-        :return: True or False, depending on if this is a legal move based on the assignment requirements.
-        """
-
-        def find_piece_at_position(position):
-            """
-            Convert the position into a recognizable index in the self._board private data member.
-            Returns the chess piece object found at the index (if applicable).  Otherwise, exceptions are raised.
-            :param position: Algebraic position of a location on the atomic chess board.
-            :return: ChessPiece-related object found at the requested position (if applicable).
-            """
-
-            # The position must adhere to the length of all chess positions (one letter + one number).
-            if len(position) == 2:
-                # Take both of the characters in the position argument and typecast for comparisons.
-                current_row, current_column = int(position[1]), position[0].lower()
-
-                # If the first character in the current_position argument is in the list of rows.
-                # If the second character in the current_position argument is in the list of columns.
-                if current_row in self._list_of_rows and current_column in self._list_of_columns:
-                    # Find the row of the object being moved, then the specific object being moved.
-                    row_of_obj = self._board[-current_row]
-                    obj_being_moved = row_of_obj[ord(current_column) - 97]
-
-                    # If the object is a from a user-defined ChessPiece or related class.
-                    if isinstance(obj_being_moved, (ChessPiece, Pawn, Rook, Knight, Bishop, Queen, King)):
-                        # Return the ChessPiece-related object being moved.
-                        return obj_being_moved
-
-        def find_pieces_impacted_by_explosion():
-            """
-            Finds the pieces which would be affected by an explosion in the 8 squares immediately surrounding
-            the piece about to be captured in all directions.  This explosion will ultimately kill all pieces in
-            its range except for Pawns.  Pawns can only be removed from the board when directly involved in a capture.
-            :return: list_of_exploding_pieces
-            """
-            # Creates blank list of indices which would be impacted by a capturing explosion.
-            list_of_exploding_indices = []
-
-            # Determines the columns and rows immediately above and below the explosion's epicenter.
-            requested_column, requested_row = requested_position[0], int(requested_position[1])
-            left_col = chr(ord(requested_column) - 1)
-            right_col = chr(ord(requested_column) + 1)
-            row_up = str(requested_row + 1)
-            row_down = str(requested_row - 1)
-
-            # Append the eight surrounding positions (and middle position) to the list_of_exploding_indices
-            list_of_exploding_indices.extend([left_col + row_down,
-                                              left_col + str(requested_row),
-                                              left_col + row_up])
-
-            list_of_exploding_indices.extend([requested_column + row_down,
-                                              requested_column + row_up])
-
-            list_of_exploding_indices.extend([right_col + row_down,
-                                              right_col + str(requested_row),
-                                              right_col + row_up])
-
-            # Creates blank list of objects impacted by the coming explosion
-            list_of_exploding_pieces = []
-
-            # For every position impacted by the coming explosion...
-            for position in list_of_exploding_indices:
-                # ... find the object which is stored at that position.
-                temp_obj = find_piece_at_position(position)
-
-                # ... and if that object is not None or a Pawn, append to the list_of_exploding_pieces.
-                # Pawns are not affected by explosions per the assignment requirements.
-                if temp_obj is not None and isinstance(temp_obj, Pawn) is False:
-                    list_of_exploding_pieces.append(temp_obj)
-
-            # Returns list of objects which would be impacted by a capturing explosion
-            return list_of_exploding_pieces
-
-        def initiate_move_on_board(piece_at_current_position, piece_at_position_being_moved_to):
-            """
-            Moves the piece_at_current_position to the requested position on the board.
-            """
-            # Retrieves the current_column and current_row
-            current_column, current_row = current_position[0], int(current_position[1])
-
-            # Sets the requested_column and requested_row from requested_position
-            requested_column, requested_row = requested_position[0], int(requested_position[1])
-
-            # Move piece_at_current_position to the requested position and update old position to '.'
-            self._board[-requested_row][ord(requested_column) - 97] = piece_at_current_position
-            piece_at_current_position.set_position(requested_position)
-            self._board[-current_row][ord(current_column) - 97] = '.'
-
-            # If a piece was captured by that move, it's explosion time!
-            if isinstance(piece_at_position_being_moved_to, (ChessPiece, Pawn, Rook, Knight, Bishop, Queen, King)):
-                
-                print("\nCaptured piece at " + requested_position + "! (Explosion in surrounding 8 cells)")
-
-                # If a Pawn captured a Pawn, both pieces are destroyed per the requirements
-                # If a Pawn captured any other piece, the capturing Pawn is destroyed as well
-                if isinstance(piece_at_current_position, Pawn):
-                    self._board[-current_row][ord(current_column) - 97] = '.'
-                    del piece_at_current_position
-
-                self._board[-requested_row][ord(requested_column) - 97] = '.'
-
-                # Checks if the captured piece was a King, and if so, designates the winner of the match
-                if (isinstance(piece_at_position_being_moved_to, King) and
-                        piece_at_position_being_moved_to.get_color() == 'white'):
-                    self._game_state = 'BLACK_WON'
-
-                if (isinstance(piece_at_position_being_moved_to, King) and
-                        piece_at_position_being_moved_to.get_color() == 'black'):
-                    self._game_state = 'WHITE_WON'
-
-                del piece_at_position_being_moved_to
-
-                # Remove any exploded (or the captured) piece(s) from the board and delete the piece objects
-                for piece_impacted in list_of_pieces_impacted_by_explosion:
-                    blown_up_column, blown_up_row = piece_impacted.get_row_and_column_from_position()
-                    blow_up_row = int(blown_up_row)
-
-                    # Removes the exploded piece from the board
-                    self._board[-blow_up_row][ord(blown_up_column) - 97] = '.'
-
-                    # Checks if the exploded / captured piece was a King (e.g., winning or losing move)
-                    if isinstance(piece_impacted, King):
-                        if piece_impacted.get_color() == 'white':
-                            print("Black wins")
-                            self._game_state = 'BLACK_WON'
-                        elif piece_impacted.get_color() == 'black':
-                            print("White wins")
-                            self._game_state = 'WHITE_WON'
-
-                    # Delete the ChessPiece-related object stored in the program's memory
-                    del piece_impacted
-
-        # Check to see if the game has already been won, if so return False
-        if self._game_state != 'UNFINISHED':
-            return False
-
-        # Finds the pieces at current_position (if applicable)
-        # If there is no piece_at_current_position, then output False
-        piece_at_current_position = find_piece_at_position(current_position)
-        if piece_at_current_position is None or piece_at_current_position == '.':
-            print("No piece at that position - try agin.")
-            return False
-
-        # Check if the moving the piece belongs to the player whose turn it is
-        # If the moving piece does not belong to the player, then output False
-        if piece_at_current_position.get_color() != self._player_turn:
-            print("That piece doesn't belong to player whose turn it is - try agin.")
-            return False
-
-        # Check to see if the requested move is legal
-        legal_moves = piece_at_current_position.get_chess_piece_moves(self._board)
-        if requested_position not in legal_moves:
-            # Pawns are the only piece which Move vs Capture, so check if the requested position is a Capture instead
-            if isinstance(piece_at_current_position, Pawn):
-                legal_captures = piece_at_current_position.get_chess_piece_captures(self._board)
-                # If the requested move is not a legal capture for the Pawn, return False
-                if requested_position not in legal_captures:
-                    print("That's not a legal move - try again.")
-                    return False
-
-            # If the piece_at_current_position is not a Pawn, return False
-            else:
-                print("That's not a legal move - try again.")
-                return False
-
-        # Record the piece at the requested position before a move is made
-        piece_at_position_being_moved_to = find_piece_at_position(requested_position)
-
-        # If the piece being moved is a King, and it would capture another piece, return False
-        if (isinstance(piece_at_position_being_moved_to, (ChessPiece, Pawn, Rook, Knight, Bishop, Queen)) and
-                isinstance(piece_at_current_position, King)):
-            print("Kings are not allowed to capture other pieces - try again.")
-            return False
-
-        # Finds the pieces which would be impacted by an explosion
-        list_of_pieces_impacted_by_explosion = find_pieces_impacted_by_explosion()
-
-        # If the move would kill both Kings in one step, disallow this per requirements
-        if isinstance(piece_at_position_being_moved_to, (ChessPiece, Pawn, Rook, Knight, Bishop, Queen)):
-            king_counter = 0
-
-            for piece in list_of_pieces_impacted_by_explosion:
-                if isinstance(piece, King):
-                    king_counter += 1
-
-            if isinstance(piece_at_position_being_moved_to, King):
-                king_counter += 1
-
-            if king_counter == 2:
-                print("This move would kill both Kings in one step, disallowed - try again.")
-                return False
-
-        # Initiates the move of the piece_at_current_position
-        initiate_move_on_board(piece_at_current_position, piece_at_position_being_moved_to)
-
-        # Updates the player_turn private data member to reflect the next player whose turn it is
-        if self._player_turn == 'white':
-            self._player_turn = 'black'
-        elif self._player_turn == 'black':
-            self._player_turn = 'white'
-
-        # Made indicated move, removed any captured (exploded) pieces, updated whose turn it is, so returning True
-        return True
-
-    def print_board(self):
-        """
-        Prints the current state of the atomic chess board based on the positions
-        of the pieces recorded in self._board private data member.
-        """
-
-        def print_border_letters():
-            """
-            Prints the letters (a through h) which are found on the top and bottom borders of the board.
-            """
-            print('  ', end='')
-            for letters in self._list_of_columns:
-                print(letters, end=' ')
-            print('\n', end='')
-
-        print('', end='\n')
-
-        # Prints the top border of letters.
-        print_border_letters()
-
-        # Prints the inner contents of the board (e.g., all pieces / empty cells located within the 8x8 board).
-        reverse_index_counter = -1
-        for row in self._board:
-            text_to_print = str(self._list_of_rows[reverse_index_counter])
-            print(text_to_print, end=' ')
-
-            for obj_at_index in row:
-                if isinstance(obj_at_index, (Pawn, Rook, Knight, Bishop, Queen, King)):
-                    if obj_at_index.get_color() == 'black':
-                        text = colored(obj_at_index.get_name(), "black", "on_light_yellow", attrs=["bold"])
-                        cprint(text, end=' ')
-                    else:
-                        text = colored(obj_at_index.get_name(), "white", "on_light_blue", attrs=["bold"])
-                        cprint(text, end=' ')
-                else:
-                    text = colored(obj_at_index, "white")
-                    print(text, end=' ')
-
-            print('', end=text_to_print + '\n')
-            reverse_index_counter -= 1
-
-        # Prints the bottom border of letters.
-        print_border_letters()
-
-        print('', end='\n')
-
-
-class ChessPiece:
-    """
-    Defines common attributes and methods for chess pieces.
-    """
-
-    def __init__(self, color, position):
-        """
-        Defines common attributes for chess pieces.
-        """
-        self._name = ''
-        self._color = color
-        self._position = position
-        self._chess_piece_turn_counter = 0
-
-    def get_color(self):
-        """
-        Returns the _color private data member initialized and tracked in this ChessPiece object.
-        """
-        return self._color
-
-    def get_chess_piece_turn_counter(self):
-        """
-        Returns the _chess_piece_turn_counter private data member initialized and tracked in this ChessPiece object.
-        """
-        return self._chess_piece_turn_counter
-
-    def get_row_and_column_from_position(self):
-        """
-        Finds the row and column on the atomic chess board of the ChessPiece object (algebraic notation).
-        :return: list_of_column_and_row
-        """
-
-        row = self._position[1]
-        column = self._position[0]
-        list_of_column_and_row = [column, row]
-        return list_of_column_and_row
-
-    def set_position(self, new_position):
-        """
-        Sets a new position for a ChessPiece object as it moves around the atomic chess board.
-        :param new_position: Position that the ChessPiece object now is positioned in.
-        """
-        self._position = new_position
-
-
-class Pawn(ChessPiece):
-    """
-    Defines attributes and methods surrounding the Pawn piece.
-    """
-
-    def __init__(self, color, position):
-        """Inherits common attributes for chess pieces and initializes unique attributes to the Pawn."""
-
-        super().__init__(color, position)
-        self._name = 'P'
-
-    def get_name(self):
-        """
-        Returns the _name private data member initialized and tracked in this object class.
-        """
-        return self._name
-
-    def get_chess_piece_moves(self, board_obj):
-        """
-        Calculates the legal moves for a Pawn and returns those possible moves for comparison elsewhere.
-        :param board_obj: The board object (list) containing sub-lists (chess board rows) whose indices contain
-        the chess pieces currently at their respective positions on the board.
-        :return: A list of legal moves for the Pawn to make.
-        """
-
-        # Retrieves the current column and row the Pawn is at
-        column, row = self.get_row_and_column_from_position()
-        row = int(row)
-
-        # Creates a blank list to store the legal moves and determines the direction of movement from piece color
-        moves = []
-        direction = 1 if self._color == 'white' else -1
-
-        # Standard move is one square forward for a Pawn
-        if 1 <= row + direction <= 8 and board_obj[-(row + direction)][ord(column) - 97] == '.':
-            moves.append(column + str(row + direction))
-
-            # Pawn can move two squares forward on it's first move (if that is requested)
-            if ((self.get_color() == 'white' and row == 2) or (self.get_color() == 'black' and row == 7)
-                    and self.get_chess_piece_turn_counter() == 0):
-                if board_obj[-(row + 2 * direction)][ord(column) - 97] == '.':
-                    moves.append(column + str(row + 2 * direction))
-
-        # Returns the list of legal moves for the Pawn object
-        return moves
-
-    def get_chess_piece_captures(self, board_obj):
-        """
-        Because the Pawn is the only chess piece which moves and captures separately, this additional method
-        is built for the Pawn class to denote positions which can be captured on the board (diagonally forward
-        left and right by one space).
-        :param board_obj: Object containing the contents of the atomic chess board.
-        :return: A list of legal captures for the Pawn to make.
-        """
-        # Retrieves the current column and row the Pawn is at
-        column, row = self.get_row_and_column_from_position()
-        row = int(row)
-
-        # Creates a blank list to store the legal captures and determines the direction of movement from piece color
-        captures = []
-        direction = 1 if self._color == 'white' else -1
-
-        # Finds the board locations which the Pawn can capture (diagonally forward left and right one square)
-        if direction == 1:
-            if 0 <= ord(column) - 98 <= 7 and isinstance(board_obj[-(row + direction)][ord(column) - 98],
-                                                         (ChessPiece, Pawn, Rook, Knight, Bishop, Queen, King)):
-                diagonal_forward_left = chr(ord(column) - 1) + str(row + 1)
-                captures.append(diagonal_forward_left)
-
-            if 0 <= ord(column) - 96 <= 7 and isinstance(board_obj[-(row + direction)][ord(column) - 96],
-                                                         (ChessPiece, Pawn, Rook, Knight, Bishop, Queen, King)):
-                diagonal_forward_right = chr(ord(column) + 1) + str(row + 1)
-                captures.append(diagonal_forward_right)
-
-        else:
-            if isinstance(board_obj[-(row + direction)][ord(column) - 96],
-                          (ChessPiece, Pawn, Rook, Knight, Bishop, Queen, King)):
-                diagonal_forward_left = chr(ord(column) + 1) + str(row - 1)
-                captures.append(diagonal_forward_left)
-
-            if isinstance(board_obj[-(row + direction)][ord(column) - 98],
-                          (ChessPiece, Pawn, Rook, Knight, Bishop, Queen, King)):
-                diagonal_forward_right = chr(ord(column) - 1) + str(row - 1)
-                captures.append(diagonal_forward_right)
-
-        # Returns the list of legal captures for the Pawn object
-        return captures
-
-
-class Rook(ChessPiece):
-    """
-    Defines attributes and methods surrounding the Rook piece.
-    """
-
-    def __init__(self, color, position):
-        """Inherits common attributes for chess pieces and initializes unique attributes to the Rook."""
-
-        super().__init__(color, position)
-        self._name = 'R'
-
-    def get_name(self):
-        """
-        Returns the _name private data member initialized and tracked in this object class.
-        """
-        return self._name
-
-    def get_chess_piece_moves(self, board_obj):
-        """
-        Calculates the legal moves for a Rook and returns those possible moves for comparison elsewhere.
-        :param board_obj: The board object (list) containing sub-lists (chess board rows) whose indices contain
-        the chess pieces currently at their respective positions on the board.
-        :return: A list of legal moves for the Rook to make.
-        """
-
-        # Retrieves the current column and row the Rook is at
-        column, row = self.get_row_and_column_from_position()
-        row = int(row)
-
-        # Creates a blank list to store the legal moves and determines the direction of movement from piece color
-        moves = []
-
-        # Down, up, right and left, respectively (row, column)
-        move_positions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-
-        # Record that the Rook can move anywhere up, down, left or right in one direction until it is blocked
-        for direction in move_positions:
-            direction_row, direction_column = direction
-            r_temp, c_temp = row + direction_row, ord(column) - 97 + direction_column
-
-            while 1 <= r_temp <= 8 and 0 <= c_temp <= 7:
-                if board_obj[-r_temp][c_temp] == '.':
-                    moves.append(str(chr(c_temp + 97) + str(r_temp)))
-                elif board_obj[-r_temp][c_temp].get_color() != self.get_color():
-                    moves.append(str(chr(c_temp + 97) + str(r_temp)))
-                    break
-                else:
-                    break
-
-                r_temp += direction_row
-                c_temp += direction_column
-
-        # Returns the list of legal moves for the Rook object
-        return moves
-
-
-class Knight(ChessPiece):
-    """
-    Defines attributes and methods surrounding the Knight piece.
-    """
-
-    def __init__(self, color, position):
-        """Inherits common attributes for chess pieces and initializes unique attributes to the Knight."""
-
-        super().__init__(color, position)
-        self._name = 'N'
-
-    def get_name(self):
-        """
-        Returns the _name private data member initialized and tracked in this object class.
-        """
-        return self._name
-
-    def get_chess_piece_moves(self, board_obj):
-        """
-        Calculates the legal moves for a Knight and returns those possible moves for comparison elsewhere.
-        :param board_obj: The board object (list) containing sub-lists (chess board rows) whose indices contain
-        the chess pieces currently at their respective positions on the board.
-        :return: A list of legal moves for the Knight to make.
-        """
-
-        # Retrieves the current column and row the Knight is at
-        column, row = self.get_row_and_column_from_position()
-        row = int(row)
-
-        # Creates lists to store the legal moves and positions which the Knight could move to
-        moves = []
-        move_positions = [
-            (2, 1), (2, -1), (-2, 1), (-2, -1),
-            (1, 2), (1, -2), (-1, 2), (-1, -2)
-        ]
-
-        # Record the Knight's legal moves
-        for direction_row, direction_column in move_positions:
-            r_temp, c_temp = row + direction_row, ord(column) - 97 + direction_column
-            if 1 <= r_temp <= 8 and 0 <= c_temp <= 7:
-                if (board_obj[-r_temp][c_temp] == '.' or
-                        board_obj[-r_temp][c_temp].get_color() != self.get_color()):
-                    moves.append(str(chr(c_temp + 97) + str(r_temp)))
-
-        # Returns the list of legal moves for the Knight object
-        return moves
-
-
-class Bishop(ChessPiece):
-    """
-    Defines attributes and methods surrounding the Bishop piece.
-    """
-
-    def __init__(self, color, position):
-        """Inherits common attributes for chess pieces and initializes unique attributes to the Bishop."""
-
-        super().__init__(color, position)
-        self._name = 'B'
-
-    def get_name(self):
-        """
-        Returns the _name private data member initialized and tracked in this object class.
-        """
-        return self._name
-
-    def get_chess_piece_moves(self, board_obj):
-        """
-        Calculates the legal moves for a Bishop and returns those possible moves for comparison elsewhere.
-        :param board_obj: The board object (list) containing sub-lists (chess board rows) whose indices contain
-        the chess pieces currently at their respective positions on the board.
-        :return: A list of legal moves for the Bishop to make.
-        """
-
-        # Retrieves the current column and row the Bishop is at
-        column, row = self.get_row_and_column_from_position()
-        row = int(row)
-
-        # Creates lists to store the legal moves and positions which the Bishop could move to
-        moves = []
-        move_positions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-
-        # Record the Bishop's legal moves
-        for direction in move_positions:
-            direction_row, direction_column = direction
-            r_temp, c_temp = row + direction_row, ord(column) - 97 + direction_column
-
-            while 1 <= r_temp <= 8 and 0 <= c_temp <= 7:
-                if board_obj[-r_temp][c_temp] == '.':
-                    moves.append(str(chr(c_temp + 97) + str(r_temp)))
-                elif board_obj[-r_temp][c_temp].get_color() != self.get_color():
-                    moves.append(str(chr(c_temp + 97) + str(r_temp)))
-                    break
-                else:
-                    break
-
-                r_temp += direction_row
-                c_temp += direction_column
-
-        # Returns the list of legal moves for the Bishop object
-        return moves
-
-
-class Queen(ChessPiece):
-    """
-    Defines attributes and methods surrounding the Queen piece.
-    """
-
-    def __init__(self, color, position):
-        """Inherits common attributes for chess pieces and initializes unique attributes to the Queen."""
-        super().__init__(color, position)
-        self._name = 'Q'
-
-    def get_name(self):
-        """
-        Returns the _name private data member initialized and tracked in this object class.
-        """
-        return self._name
-
-    def get_chess_piece_moves(self, board_obj):
-        """
-        Calculates the legal moves for a Queen and returns those possible moves for comparison elsewhere.
-        :param board_obj: The board object (list) containing sub-lists (chess board rows) whose indices contain
-        the chess pieces currently at their respective positions on the board.
-        :return: A list of legal moves for the Queen to make.
-        """
-
-        # Retrieves the current column and row the Queen is at
-        column, row = self.get_row_and_column_from_position()
-        row = int(row)
-
-        # Creates a blank list to store the legal moves and determines the direction of movement from piece color
-        moves = []
-
-        # Move sets - former like the Rook and the latter like the Bishop
-        move_positions_1 = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-        move_positions_2 = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-
-        # Record the Queen's legal moves (those which are like the Rook)
-        for direction in move_positions_1:
-            direction_row, direction_column = direction
-            r_temp, c_temp = row + direction_row, ord(column) - 97 + direction_column
-
-            while 1 <= r_temp <= 8 and 0 <= c_temp <= 7:
-                if board_obj[-r_temp][c_temp] == '.':
-                    moves.append(str(chr(c_temp + 97) + str(r_temp)))
-                elif board_obj[-r_temp][c_temp].get_color() != self.get_color():
-                    moves.append(str(chr(c_temp + 97) + str(r_temp)))
-                    break
-                else:
-                    break
-
-                r_temp += direction_row
-                c_temp += direction_column
-
-        # Record the Bishop's legal moves (those which are like the Bishop)
-        for direction in move_positions_2:
-            direction_row, direction_column = direction
-            r_temp, c_temp = row + direction_row, ord(column) - 97 + direction_column
-
-            while 1 <= r_temp <= 8 and 0 <= c_temp <= 7:
-                if board_obj[-r_temp][c_temp] == '.':
-                    moves.append(str(chr(c_temp + 97) + str(r_temp)))
-                elif board_obj[-r_temp][c_temp].get_color() != self.get_color():
-                    moves.append(str(chr(c_temp + 97) + str(r_temp)))
-                    break
-                else:
-                    break
-
-                r_temp += direction_row
-                c_temp += direction_column
-
-        # Returns the list of legal moves for the Queen object
-        return moves
-
-
-class King(ChessPiece):
-    """
-    Defines attributes and methods surrounding the King piece.
-    """
-
-    def __init__(self, color, position):
-        """Inherits common attributes for chess pieces and initializes unique attributes to the King."""
-
-        super().__init__(color, position)
-        self._name = 'K'
-
-    def get_name(self):
-        """
-        Returns the _name private data member initialized and tracked in this object class.
-        """
-        return self._name
-
-    def get_chess_piece_moves(self, board_obj):
-        """
-        Calculates the legal moves for a King and returns those possible moves for comparison elsewhere.
-        :param board_obj: The board object (list) containing sub-lists (chess board rows) whose indices contain
-        the chess pieces currently at their respective positions on the board.
-        :return: A list of legal moves for the King to make.
-        """
-
-        # Retrieves the current column and row the King is at
-        column, row = self.get_row_and_column_from_position()
-        row = int(row)
-
-        # Creates lists to store the legal moves and positions which the King could move to
-        moves = []
-        move_positions = [
-            (1, 0), (1, 1), (0, 1), (-1, 1),
-            (-1, 0), (-1, -1), (0, -1), (1, -1)
-        ]
-
-        # Record the King's legal moves
-        for direction_row, direction_column in move_positions:
-            r_temp, c_temp = row + direction_row, ord(column) - 97 + direction_column
-            if 1 <= r_temp <= 8 and 0 <= c_temp <= 7:
-                if board_obj[-r_temp][c_temp] == '.' or board_obj[-r_temp][c_temp].get_color() != self.get_color():
-                    moves.append(str(chr(c_temp + 97) + str(r_temp)))
-
-        # Returns the list of legal moves for the King object
-        return moves
-
-
-def main():
-    game = ChessVar()
-    print("Welcome to Atomic Chess!\nWritten by github.com/sonnenco (2024)")
-
-    while game.get_game_state() == 'UNFINISHED':
-        game.print_board()
-        print("It is " + game.get_player_turn() + "'s turn.")
-        print("Cell to move from? (e.g., a1, d5)")
-        current_space = input()
-        print("Where to move?")
-        requested_space = input()
-        game.make_move(current_space, requested_space)
-
-    print("\nWe have a winner! Final board:")
-    game.print_board()
-
-main()
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: A project drafted to meet the requirements of the portfolio-project for CS162 at Oregon State University.
+
+import random
+from collections import namedtuple
+
+# Colors and piece types used by the bitboard backend.  A piece code is color * 6 + piece type.
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+COLOR_NAMES = ('white', 'black')
+PIECE_NAMES = ('P', 'N', 'B', 'R', 'Q', 'K')
+
+# Squares are numbered 0 (a1) through 63 (h8), left to right along a row and then up the board.
+SQUARE_NAMES = [column + str(row) for row in range(1, 9) for column in 'abcdefgh']
+SQUARE_INDICES = {name: index for index, name in enumerate(SQUARE_NAMES)}
+
+# Masks used to stop bitboard shifts from wrapping around the edges of the board.
+FULL_BOARD = (1 << 64) - 1
+FILE_A = 0x0101010101010101
+FILE_B = FILE_A << 1
+FILE_G = FILE_A << 6
+FILE_H = FILE_A << 7
+NOT_FILE_A = FULL_BOARD ^ FILE_A
+NOT_FILE_H = FULL_BOARD ^ FILE_H
+NOT_FILES_AB = FULL_BOARD ^ (FILE_A | FILE_B)
+NOT_FILES_GH = FULL_BOARD ^ (FILE_G | FILE_H)
+RANK_2 = 0xFF << 8
+RANK_7 = 0xFF << 48
+
+# Sliding directions as square offsets: up, down, right, left, and the four diagonals.
+ROOK_DIRECTIONS = (8, -8, 1, -1)
+BISHOP_DIRECTIONS = (9, 7, -7, -9)
+
+
+def build_rays():
+    """
+    Builds a bitboard for every sliding direction from every square, running to the edge of the board.
+    :return: Dictionary mapping a direction offset to a list of 64 ray bitboards.
+    """
+    steps = {8: (1, 0), -8: (-1, 0), 1: (0, 1), -1: (0, -1), 9: (1, 1), 7: (1, -1), -7: (-1, 1), -9: (-1, -1)}
+    rays = {}
+    for direction, (step_row, step_column) in steps.items():
+        rays[direction] = []
+        for square in range(64):
+            ray = 0
+            row, column = square // 8 + step_row, square % 8 + step_column
+            while 0 <= row <= 7 and 0 <= column <= 7:
+                ray |= 1 << (row * 8 + column)
+                row += step_row
+                column += step_column
+            rays[direction].append(ray)
+    return rays
+
+
+RAYS = build_rays()
+
+
+def sliding_attacks(square, occupied, directions):
+    """
+    Finds the squares a sliding piece attacks from square, stopping at (and including) the first blocker.
+    :param square: Index (0-63) of the sliding piece.
+    :param occupied: Bitboard of every occupied square.
+    :param directions: Direction offsets the piece slides along.
+    :return: Bitboard of attacked squares.
+    """
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][square]
+        blockers = ray & occupied
+        if blockers:
+            # Rays pointing up the board hit their lowest blocker first, rays pointing down their highest.
+            if direction > 0:
+                first_blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                first_blocker = blockers.bit_length() - 1
+            ray ^= RAYS[direction][first_blocker]
+        attacks |= ray
+    return attacks
+
+
+def knight_attacks(bitboard):
+    """
+    Shifts a bitboard of knights to the squares those knights attack.
+    """
+    return ((bitboard << 17 & NOT_FILE_A) | (bitboard << 15 & NOT_FILE_H) |
+            (bitboard << 10 & NOT_FILES_AB) | (bitboard << 6 & NOT_FILES_GH) |
+            (bitboard >> 17 & NOT_FILE_H) | (bitboard >> 15 & NOT_FILE_A) |
+            (bitboard >> 10 & NOT_FILES_GH) | (bitboard >> 6 & NOT_FILES_AB)) & FULL_BOARD
+
+
+def king_attacks(bitboard):
+    """
+    Shifts a bitboard of kings to the squares those kings attack (also the 8 squares hit by an explosion).
+    """
+    sideways = (bitboard << 1 & NOT_FILE_A) | (bitboard >> 1 & NOT_FILE_H)
+    row = bitboard | sideways
+    return (sideways | row << 8 | row >> 8) & FULL_BOARD
+
+
+def pawn_captures(bitboard, color):
+    """
+    Shifts a bitboard of pawns to the two squares diagonally forward of each pawn.
+    """
+    if color == WHITE:
+        return ((bitboard << 9 & NOT_FILE_A) | (bitboard << 7 & NOT_FILE_H)) & FULL_BOARD
+    return (bitboard >> 7 & NOT_FILE_A) | (bitboard >> 9 & NOT_FILE_H)
+
+
+def build_square_tables(attacks_function):
+    """
+    Runs a bitboard attack function once for every square.
+    :return: Tuple of (list of 64 bitboards, list of 64 tuples of target squares).
+    """
+    masks = [attacks_function(1 << square) for square in range(64)]
+    targets = [tuple(iterate_bits(mask)) for mask in masks]
+    return masks, targets
+
+
+def iterate_bits(bitboard):
+    """
+    Yields the index of every set bit in a bitboard, lowest square first.
+    """
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+
+# Board row index (8th row first, as in ChessVar._board) and column index of every square.
+SQUARE_CELLS = [(7 - square // 8, square % 8) for square in range(64)]
+
+# Per-square tables built once at import: knight and king targets, pawn capture targets for each color,
+# and the 8 squares around each square which are caught in an explosion centred on it.
+KNIGHT_ATTACKS, KNIGHT_TARGETS = build_square_tables(knight_attacks)
+KING_ATTACKS, KING_TARGETS = build_square_tables(king_attacks)
+WHITE_PAWN_ATTACKS, WHITE_PAWN_TARGETS = build_square_tables(lambda bit: pawn_captures(bit, WHITE))
+BLACK_PAWN_ATTACKS, BLACK_PAWN_TARGETS = build_square_tables(lambda bit: pawn_captures(bit, BLACK))
+PAWN_ATTACKS = (WHITE_PAWN_ATTACKS, BLACK_PAWN_ATTACKS)
+PAWN_CAPTURE_TARGETS = (WHITE_PAWN_TARGETS, BLACK_PAWN_TARGETS)
+EXPLOSION_MASKS, EXPLOSION_ZONES = KING_ATTACKS, KING_TARGETS
+
+
+def piece_targets(square, piece_code, occupancy):
+    """
+    Finds every square the piece on square could move or capture to, following the same movement rules
+    as the get_chess_piece_moves methods of the piece classes.
+    :param square: Index (0-63) of the piece being moved.
+    :param piece_code: Piece code (color * 6 + piece type) of the piece being moved.
+    :param occupancy: List of the white and black occupancy bitboards.
+    :return: Bitboard of reachable squares.
+    """
+    color, piece_type = divmod(piece_code, 6)
+    occupied = occupancy[WHITE] | occupancy[BLACK]
+
+    if piece_type == PAWN:
+        # Pawns move straight forward onto empty squares (two squares from their starting row),
+        # and capture diagonally forward onto any occupied square.
+        empty = FULL_BOARD ^ occupied
+        if color == WHITE:
+            single_step = 1 << square << 8 & empty
+            double_step = (single_step & RANK_2 << 8) << 8 & empty
+        else:
+            single_step = 1 << square >> 8 & empty
+            double_step = (single_step & RANK_7 >> 8) >> 8 & empty
+        return single_step | double_step | (PAWN_ATTACKS[color][square] & occupied)
+
+    if piece_type == KNIGHT:
+        targets = KNIGHT_ATTACKS[square]
+    elif piece_type == KING:
+        targets = KING_ATTACKS[square]
+    elif piece_type == BISHOP:
+        targets = sliding_attacks(square, occupied, BISHOP_DIRECTIONS)
+    elif piece_type == ROOK:
+        targets = sliding_attacks(square, occupied, ROOK_DIRECTIONS)
+    else:
+        targets = sliding_attacks(square, occupied, ROOK_DIRECTIONS + BISHOP_DIRECTIONS)
+
+    # Pieces other than Pawns cannot land on a piece of their own color.
+    return targets & ~occupancy[color]
+
+
+# Directions each sliding piece type moves in, indexed by piece type (None for the other pieces).
+SLIDER_DIRECTIONS = (None, None, BISHOP_DIRECTIONS, ROOK_DIRECTIONS, ROOK_DIRECTIONS + BISHOP_DIRECTIONS, None)
+
+
+def piece_attacks(square, piece_code, occupied):
+    """
+    Finds the squares a piece could capture on, were an enemy piece standing there.  Squares holding
+    pieces of its own color are included, as the piece guards them.  Kings never capture, so they attack nothing.
+    :param square: Index (0-63) of the piece.
+    :param piece_code: Piece code (color * 6 + piece type) of the piece.
+    :param occupied: Bitboard of every occupied square, which blocks sliding pieces.
+    :return: Bitboard of attacked squares.
+    """
+    color, piece_type = divmod(piece_code, 6)
+    if piece_type == PAWN:
+        return PAWN_ATTACKS[color][square]
+    if piece_type == KNIGHT:
+        return KNIGHT_ATTACKS[square]
+    if piece_type == KING:
+        return 0
+    return sliding_attacks(square, occupied, SLIDER_DIRECTIONS[piece_type])
+
+
+# Moves returned by ChessVar.generate_legal_moves are encoded as from_square | to_square << 6 | capture flag.
+MOVE_CAPTURE = 1 << 12
+
+
+def encode_move(from_square, to_square, capture=False):
+    """
+    Packs a move into a single integer.
+    :param from_square: Index (0-63) the piece moves from.
+    :param to_square: Index (0-63) the piece moves to.
+    :param capture: True if the move captures a piece (and so sets off an explosion).
+    """
+    return from_square | to_square << 6 | (MOVE_CAPTURE if capture else 0)
+
+
+def move_from_square(move):
+    """
+    Returns the index (0-63) an encoded move starts from.
+    """
+    return move & 63
+
+
+def move_to_square(move):
+    """
+    Returns the index (0-63) an encoded move ends on.
+    """
+    return move >> 6 & 63
+
+
+def move_is_capture(move):
+    """
+    Returns True if an encoded move captures a piece.
+    """
+    return move & MOVE_CAPTURE != 0
+
+
+def move_to_positions(move):
+    """
+    Converts an encoded move into the (current_position, requested_position) pair accepted by make_move.
+    """
+    return SQUARE_NAMES[move & 63], SQUARE_NAMES[move >> 6 & 63]
+
+
+def build_zobrist_keys(seed=0x41544F4D):
+    """
+    Draws the random 64-bit numbers used for Zobrist hashing.  A fixed seed keeps keys identical
+    across processes, so hashes can be shared between workers or saved to disk.
+    :return: Tuple of (keys indexed by piece code and then square, key for black to move).
+    """
+    generator = random.Random(seed)
+    piece_keys = [[generator.getrandbits(64) for _ in range(64)] for _ in range(12)]
+    return piece_keys, generator.getrandbits(64)
+
+
+ZOBRIST_PIECE_KEYS, ZOBRIST_BLACK_TO_MOVE = build_zobrist_keys()
+
+
+def piece_object_code(piece):
+    """
+    Returns the piece code (color * 6 + piece type) of a ChessPiece object.
+    """
+    return piece.get_piece_code()
+
+
+class MoveResult(namedtuple('MoveResult', ['applied', 'reason', 'exploded_squares', 'game_state'])):
+    """
+    Outcome of ChessVar.play_move.
+    applied: True if the move was made.
+    reason: MOVE_OK, or the reason code the move was rejected for.
+    exploded_squares: Squares whose pieces an explosion destroyed (the captured square first), else empty.
+    game_state: Game state after the move.
+    A MoveResult is true only if the move was applied, so `if game.make_move(...)` works in headless mode too.
+    """
+    __slots__ = ()
+
+    def __bool__(self):
+        return self.applied
+
+
+# Reason codes for MoveResult, with the message make_move sends to the message hook for each rejection.
+MOVE_OK = 'OK'
+GAME_ALREADY_WON = 'GAME_ALREADY_WON'
+NO_PIECE = 'NO_PIECE'
+NOT_PLAYERS_PIECE = 'NOT_PLAYERS_PIECE'
+ILLEGAL_MOVE = 'ILLEGAL_MOVE'
+KING_CAPTURE = 'KING_CAPTURE'
+BOTH_KINGS_EXPLODE = 'BOTH_KINGS_EXPLODE'
+REJECTION_MESSAGES = {
+    GAME_ALREADY_WON: None,
+    NO_PIECE: "No piece at that position - try agin.",
+    NOT_PLAYERS_PIECE: "That piece doesn't belong to player whose turn it is - try agin.",
+    ILLEGAL_MOVE: "That's not a legal move - try again.",
+    KING_CAPTURE: "Kings are not allowed to capture other pieces - try again.",
+    BOTH_KINGS_EXPLODE: "This move would kill both Kings in one step, disallowed - try again.",
+}
+
+# Piece values in centipawns by piece type (Pawn, Knight, Bishop, Rook, Queen).  Losing a King loses the game,
+# so it is reported separately rather than given a value.
+PIECE_VALUES = (100, 300, 320, 500, 900, 0)
+
+# Positions whose capture outcomes are kept by ChessVar.get_capture_outcomes before the cache is emptied.
+CAPTURE_CACHE_SIZE = 4096
+
+
+class CaptureOutcome(namedtuple('CaptureOutcome', ['move', 'destroyed', 'material_swing', 'own_king_destroyed',
+                                                   'enemy_king_destroyed', 'reason'])):
+    """
+    What one capture would do, from ChessVar.get_capture_outcomes.
+    move: Encoded capture (see encode_move), with MOVE_CAPTURE set.
+    destroyed: Tuple of (square, piece code) pairs: the capturing piece, the captured piece, then every piece
+    other than a Pawn in the 8 surrounding squares.
+    material_swing: Value (see PIECE_VALUES) of the opponent's pieces destroyed minus the value of the
+    capturing player's own pieces destroyed, Kings not counted.
+    own_king_destroyed, enemy_king_destroyed: Whether the capturing player's King, or the opponent's, is destroyed.
+    reason: MOVE_OK if the capture is legal, else KING_CAPTURE or BOTH_KINGS_EXPLODE (see check_move).
+    """
+    __slots__ = ()
+
+
+# FEN letters of the 12 piece codes: upper case for white, lower case for black.
+FEN_PIECE_LETTERS = PIECE_NAMES + tuple(name.lower() for name in PIECE_NAMES)
+FEN_PIECE_CODES = {letter: piece_code for piece_code, letter in enumerate(FEN_PIECE_LETTERS)}
+
+# Atomic chess here has no castling or en passant and no move clock, so to_fen always writes these fields.
+FEN_UNUSED_FIELDS = '- - 0'
+
+
+class Position(namedtuple('Position', ['bitboards', 'player_turn', 'move_number'])):
+    """
+    Compact position as read from a FEN string, without any piece objects.
+    bitboards: Tuple of 12 bitboards, one per piece code (color * 6 + piece type).
+    player_turn: WHITE or BLACK.
+    move_number: Full move number, starting at 1 and increased after each of black's moves.
+    """
+    __slots__ = ()
+
+
+# Parsed FEN ranks, one dictionary per rank (8th rank first).  The same rank strings come up again and
+# again in large position sets, so each one is only parsed once.
+_FEN_RANK_CACHES = [{} for _ in range(8)]
+_FEN_RANK_CACHE_LIMIT = 50000
+
+
+def _parse_fen_rank(rank_index, rank_text):
+    """
+    Parses one rank of the piece placement field of a FEN string.
+    :param rank_index: 0 for the 8th rank (the first one written) through 7 for the 1st rank.
+    :return: Tuple of (piece code, bitboard of its squares on this rank) pairs for the pieces on the rank.
+    """
+    squares_by_code = {}
+    column = 0
+    for char in rank_text:
+        if char in '12345678':
+            column += int(char)
+            continue
+        if char not in FEN_PIECE_CODES or column > 7:
+            raise ValueError("Invalid FEN rank: " + rank_text)
+        piece_code = FEN_PIECE_CODES[char]
+        squares_by_code[piece_code] = squares_by_code.get(piece_code, 0) | 1 << ((7 - rank_index) * 8 + column)
+        column += 1
+    if column != 8:
+        raise ValueError("Invalid FEN rank: " + rank_text)
+    return tuple(squares_by_code.items())
+
+
+def parse_fen(fen):
+    """
+    Parses a FEN string into a Position without creating any piece objects.  Castling, en passant and
+    half move fields are accepted but ignored, as the variant has none of them.
+    :param fen: FEN string; only the piece placement field is required, white moves if the rest is missing.
+    :return: Position.
+    """
+    fields = fen.split()
+    if not fields:
+        raise ValueError("Empty FEN string")
+    ranks = fields[0].split('/')
+    if len(ranks) != 8:
+        raise ValueError("FEN piece placement needs 8 ranks: " + fields[0])
+
+    bitboards = [0] * 12
+    for rank_index, rank_cache, rank_text in zip(range(8), _FEN_RANK_CACHES, ranks):
+        squares_by_code = rank_cache.get(rank_text)
+        if squares_by_code is None:
+            if len(rank_cache) >= _FEN_RANK_CACHE_LIMIT:
+                rank_cache.clear()
+            squares_by_code = rank_cache[rank_text] = _parse_fen_rank(rank_index, rank_text)
+        for piece_code, squares in squares_by_code:
+            bitboards[piece_code] |= squares
+
+    if len(fields) < 2 or fields[1] == 'w':
+        player_turn = WHITE
+    elif fields[1] == 'b':
+        player_turn = BLACK
+    else:
+        raise ValueError("FEN side to move must be 'w' or 'b': " + fields[1])
+
+    move_number = 1
+    if len(fields) >= 6:
+        if not fields[5].isdigit() or int(fields[5]) < 1:
+            raise ValueError("Invalid FEN move number: " + fields[5])
+        move_number = int(fields[5])
+
+    return Position(tuple(bitboards), player_turn, move_number)
+
+
+def load_fens(lines):
+    """
+    Parses FEN strings in bulk, skipping blank lines and lines starting with '#'.
+    :param lines: Iterable of FEN strings, such as an open file.
+    :return: Generator of Positions, one per FEN string.
+    """
+    for line in lines:
+        line = line.strip()
+        if line and line[0] != '#':
+            yield parse_fen(line)
+
+
+def position_to_fen(position):
+    """
+    Writes a Position as a FEN string.
+    """
+    mailbox = [None] * 64
+    for piece_code, bitboard in enumerate(position.bitboards):
+        for square in iterate_bits(bitboard):
+            mailbox[square] = FEN_PIECE_LETTERS[piece_code]
+
+    ranks = []
+    for row in range(7, -1, -1):
+        rank_text = ''
+        empty_squares = 0
+        for letter in mailbox[row * 8:row * 8 + 8]:
+            if letter is None:
+                empty_squares += 1
+                continue
+            if empty_squares:
+                rank_text += str(empty_squares)
+                empty_squares = 0
+            rank_text += letter
+        if empty_squares:
+            rank_text += str(empty_squares)
+        ranks.append(rank_text)
+
+    return ' '.join(['/'.join(ranks), 'wb'[position.player_turn], FEN_UNUSED_FIELDS, str(position.move_number)])
+
+
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'
+STARTING_POSITION = parse_fen(STARTING_FEN)
+
+
+class ChessVar:
+    """An abstract board game that is a variant of chess called 'atomic chess.'
+    See README.md for long-description of the game's requirements."""
+
+    def __init__(self, backend='list', headless=False, message_hook=None, position=None):
+        """
+        Initialization method for the match of atomic chess.
+        :param backend: 'list' keeps the board as 8 lists of piece objects, 'bitboard' keeps one 64-bit
+        integer per piece type and color (plus occupancy) for faster move generation and explosions.
+        :param headless: If True, make_move returns a MoveResult and prints nothing.
+        :param message_hook: Function called with each message about rejected moves, captures and winners.
+        Defaults to print, or to no messages at all in headless mode.
+        :param position: Position to start from (see parse_fen) instead of the standard starting position.
+        """
+        if backend not in ('list', 'bitboard'):
+            raise ValueError("backend must be 'list' or 'bitboard'")
+
+        self._backend = backend
+        self._headless = headless
+        self._message_hook = message_hook if message_hook is not None or headless else print
+        self._board = []
+        self._game_state = 'UNFINISHED'
+        self._player_turn = 'white'
+
+        # Each move made records what it changed here so that pop() can reverse it.
+        self._undo_stack = []
+
+        # Plies played before this object was created (white's first move is ply 0), for the FEN move number.
+        self._starting_ply = 0
+
+        # Bit r is set while row r of the list backend's self._board may be shared with a copy (see copy).
+        self._shared_rows = 0
+
+        # Results of get_capture_outcomes by Zobrist key, shared with copies of this object.
+        self._capture_outcomes = {}
+
+        # Both backends are set up from a Position, the standard starting position unless another is given.
+        self._load_position(STARTING_POSITION if position is None else position)
+
+    def _load_position(self, position):
+        """
+        Sets up the board, player turn, game state and Zobrist key from a Position.
+        The bitboard backend takes the bitboards as they are: self._bitboards holds one bitboard per piece
+        code, self._occupancy one bitboard per color, and self._mailbox the piece code (or None) on each of
+        the 64 squares for quick lookups.  The list backend puts the shared piece object for each piece
+        code (see PIECE_OBJECTS) on its square.
+        """
+        bitboards = position.bitboards
+        if len(bitboards) != 12:
+            raise ValueError("A position needs 12 bitboards")
+        for color in (WHITE, BLACK):
+            if bitboards[color * 6 + KING] & (bitboards[color * 6 + KING] - 1):
+                raise ValueError("A position can't have more than one " + COLOR_NAMES[color] + " King")
+        white_king, black_king = bitboards[KING], bitboards[6 + KING]
+        if not white_king and not black_king:
+            raise ValueError("A position needs at least one King")
+
+        mailbox = [None] * 64
+        occupancy = [0, 0]
+        for piece_code, bitboard in enumerate(bitboards):
+            if bitboard & (occupancy[0] | occupancy[1]):
+                raise ValueError("A position can't have two pieces on one square")
+            occupancy[piece_code // 6] |= bitboard
+            for square in iterate_bits(bitboard):
+                mailbox[square] = piece_code
+
+        if self._backend == 'bitboard':
+            self._bitboards = list(bitboards)
+            self._occupancy = occupancy
+            self._mailbox = mailbox
+
+            # The bitboard backend does not keep a list of piece objects around.
+            self._board = None
+        else:
+            self._board = [['.'] * 8 for _ in range(8)]
+            self._shared_rows = 0
+            for square, piece_code in enumerate(mailbox):
+                if piece_code is not None:
+                    row_index, column_index = SQUARE_CELLS[square]
+                    self._board[row_index][column_index] = PIECE_OBJECTS[piece_code]
+
+        self._player_turn = COLOR_NAMES[position.player_turn]
+        self._starting_ply = (position.move_number - 1) * 2 + position.player_turn
+
+        # A position with a single King comes from a game that has already been won.
+        if not white_king:
+            self._game_state = 'BLACK_WON'
+        elif not black_king:
+            self._game_state = 'WHITE_WON'
+        else:
+            self._game_state = 'UNFINISHED'
+
+        self._zobrist_key = self._compute_zobrist_key()
+        self._setup_piece_tracking()
+
+    @classmethod
+    def from_fen(cls, fen, backend='list', headless=False, message_hook=None):
+        """
+        Creates a game starting from the position of a FEN string (see parse_fen).
+        The other parameters are those of __init__.
+        """
+        return cls(backend, headless, message_hook, parse_fen(fen))
+
+    def get_position(self):
+        """
+        Returns the current position as a Position, which to_fen writes out and __init__ accepts.
+        """
+        if self._backend == 'bitboard':
+            bitboards = tuple(self._bitboards)
+        else:
+            bitboards = tuple(self._list_board_to_bitboards()[0])
+        ply = self._starting_ply + len(self._undo_stack)
+        return Position(bitboards, COLOR_NAMES.index(self._player_turn), ply // 2 + 1)
+
+    def to_fen(self):
+        """
+        Returns the current position as a FEN string.  Castling and en passant fields are always '-'
+        and the half move clock always 0, as the variant has none of them.
+        """
+        return position_to_fen(self.get_position())
+
+    def _list_board_to_bitboards(self):
+        """
+        Reads the piece objects in self._board into bitboards.
+        :return: Tuple of (bitboards per piece code, occupancy per color, mailbox of piece codes).
+        """
+        bitboards = [0] * 12
+        occupancy = [0, 0]
+        mailbox = [None] * 64
+
+        for square in range(64):
+            row_index, column_index = SQUARE_CELLS[square]
+            obj_at_square = self._board[row_index][column_index]
+            if isinstance(obj_at_square, ChessPiece):
+                piece_code = piece_object_code(obj_at_square)
+                bitboards[piece_code] |= 1 << square
+                occupancy[piece_code // 6] |= 1 << square
+                mailbox[square] = piece_code
+
+        return bitboards, occupancy, mailbox
+
+    def _compute_zobrist_key(self):
+        """
+        Computes the Zobrist key of the current position from scratch: one random number for every
+        piece on its square, plus one more when it is black's turn.
+        """
+        key = ZOBRIST_BLACK_TO_MOVE if self._player_turn == 'black' else 0
+        for square in range(64):
+            piece_code = self.get_piece_code_at(square)
+            if piece_code is not None:
+                key ^= ZOBRIST_PIECE_KEYS[piece_code][square]
+        return key
+
+    def get_piece_counts(self):
+        """
+        Returns a list of 12 counts: how many pieces of each piece code (color * 6 + piece type) are on the board.
+        """
+        if self._backend == 'bitboard':
+            return [bin(bitboard).count('1') for bitboard in self._bitboards]
+
+        counts = [0] * 12
+        for row in self._board:
+            for obj_at_square in row:
+                if obj_at_square != '.':
+                    counts[piece_object_code(obj_at_square)] += 1
+        return counts
+
+    def _setup_piece_tracking(self):
+        """
+        Builds the piece lists, King squares and attack maps from the board.  From then on _take_piece and
+        _place_piece keep them up to date through _track_piece, for either backend:
+        self._piece_lists holds, per color, a dictionary of square to piece code,
+        self._color_squares a bitboard of each color's pieces,
+        self._king_squares the square of each color's King (None once it has been destroyed),
+        self._attacks_from the bitboard of squares attacked by the piece on each square (see piece_attacks),
+        self._changed_squares a bitboard of the squares changed since self._attacks_from was last brought up to date.
+        """
+        self._piece_lists = [{}, {}]
+        self._color_squares = [0, 0]
+        self._king_squares = [None, None]
+        self._attacks_from = [0] * 64
+        self._changed_squares = FULL_BOARD
+
+        for square in range(64):
+            piece_code = self.get_piece_code_at(square)
+            if piece_code is not None:
+                self._track_piece(square, piece_code, True)
+
+    def _track_piece(self, square, piece_code, placed):
+        """
+        Updates the piece lists and King squares for one piece being placed on or taken off square,
+        and marks the square as changed for the attack maps (see _update_attacks).
+        :param placed: True if the piece was placed on square, False if it was taken off.
+        """
+        color = piece_code // 6
+        if placed:
+            self._piece_lists[color][square] = piece_code
+            self._color_squares[color] |= 1 << square
+            if piece_code % 6 == KING:
+                self._king_squares[color] = square
+        else:
+            del self._piece_lists[color][square]
+            self._color_squares[color] ^= 1 << square
+            if piece_code % 6 == KING:
+                self._king_squares[color] = None
+        self._changed_squares |= 1 << square
+
+    def _update_attacks(self):
+        """
+        Brings self._attacks_from up to date with the squares changed since the last update.  Moves made and
+        taken back during a search only mark squares, so the attack maps cost nothing until they are asked for.
+        Only pieces on changed squares and sliding pieces whose lines reached a changed square are recomputed:
+        a line which stopped before every changed square still stops at the same piece.
+        """
+        changed = self._changed_squares
+        if not changed:
+            return
+        self._changed_squares = 0
+
+        attacks_from = self._attacks_from
+        for square in iterate_bits(changed):
+            attacks_from[square] = 0
+
+        occupied = self._color_squares[WHITE] | self._color_squares[BLACK]
+        for pieces in self._piece_lists:
+            for square, piece_code in pieces.items():
+                if changed >> square & 1:
+                    attacks_from[square] = piece_attacks(square, piece_code, occupied)
+                elif attacks_from[square] & changed and SLIDER_DIRECTIONS[piece_code % 6] is not None:
+                    attacks_from[square] = sliding_attacks(square, occupied, SLIDER_DIRECTIONS[piece_code % 6])
+
+    def get_piece_list(self, color):
+        """
+        Returns the pieces of a color as a list of (square, piece code) pairs, in no particular order.
+        :param color: 'white' or 'black'.
+        """
+        return list(self._piece_lists[COLOR_NAMES.index(color)].items())
+
+    def get_king_square(self, color):
+        """
+        Returns the square (0-63) of a color's King, or None if it has been destroyed.
+        :param color: 'white' or 'black'.
+        """
+        return self._king_squares[COLOR_NAMES.index(color)]
+
+    def get_attacked_squares(self, color):
+        """
+        Returns a bitboard of the squares the pieces of a color could capture on (see piece_attacks).
+        Use iterate_bits and SQUARE_NAMES to list them.
+        :param color: 'white' or 'black'.
+        """
+        self._update_attacks()
+        attacks_from = self._attacks_from
+        attacked = 0
+        for square in self._piece_lists[COLOR_NAMES.index(color)]:
+            attacked |= attacks_from[square]
+        return attacked
+
+    def is_square_attacked(self, square, color):
+        """
+        Returns True if any piece of color could capture on square (0-63).
+        """
+        self._update_attacks()
+        attacks_from = self._attacks_from
+        for piece_square in self._piece_lists[COLOR_NAMES.index(color)]:
+            if attacks_from[piece_square] >> square & 1:
+                return True
+        return False
+
+    def kings_adjacent(self):
+        """
+        Returns True if the two Kings stand next to each other, so that no explosion can destroy just one of them.
+        """
+        white_king, black_king = self._king_squares
+        return white_king is not None and black_king is not None and KING_ATTACKS[white_king] >> black_king & 1 == 1
+
+    def get_pieces_in_blast_zone(self, square, color):
+        """
+        Returns the pieces of a color which a capture on square would destroy: the piece on square itself
+        and every piece other than a Pawn in the 8 squares around it (the capturing piece is not included).
+        :param square: Index (0-63) of the square captured on.
+        :param color: 'white' or 'black'.
+        :return: List of (square, piece code) pairs.
+        """
+        pieces = self._piece_lists[COLOR_NAMES.index(color)]
+        in_zone = []
+        if square in pieces:
+            in_zone.append((square, pieces[square]))
+        for zone_square in iterate_bits(EXPLOSION_MASKS[square] & self._color_squares[COLOR_NAMES.index(color)]):
+            if pieces[zone_square] % 6 != PAWN:
+                in_zone.append((zone_square, pieces[zone_square]))
+        return in_zone
+
+    def get_capture_outcomes(self):
+        """
+        Works out, in one pass, what every capture the player to move could try would do: the pieces destroyed,
+        the material won or lost, whether either King is destroyed, and whether the rules allow the capture
+        (captures by Kings are included, marked KING_CAPTURE).  Each square's surrounding pieces are looked up
+        once, however many pieces could capture there.  Results are cached by position, so asking again
+        before the board changes (or after returning to the same position) costs a dictionary lookup.
+        :return: Tuple of CaptureOutcome, one per capture; empty once the game has been won.
+        """
+        outcomes = self._capture_outcomes.get(self._zobrist_key)
+        if outcomes is not None:
+            return outcomes
+        if self._game_state != 'UNFINISHED':
+            return ()
+
+        color = WHITE if self._player_turn == 'white' else BLACK
+        own_pieces, enemy_pieces = self._piece_lists[color], self._piece_lists[1 - color]
+        piece_codes = dict(own_pieces)
+        piece_codes.update(enemy_pieces)
+        occupancy = self._color_squares
+        occupied = occupancy[WHITE] | occupancy[BLACK]
+
+        # Pieces other than Pawns around each square captured on, shared by every capture on the square.
+        zone_victims = {}
+        outcomes = []
+        for from_square, moving_code in own_pieces.items():
+            for to_square in iterate_bits(piece_targets(from_square, moving_code, occupancy) & occupied):
+                victims = zone_victims.get(to_square)
+                if victims is None:
+                    victims = zone_victims[to_square] = [
+                        (square, piece_codes[square]) for square in iterate_bits(EXPLOSION_MASKS[to_square] & occupied)
+                        if piece_codes[square] % 6 != PAWN]
+
+                destroyed = [(from_square, moving_code), (to_square, piece_codes[to_square])]
+                destroyed.extend(victim for victim in victims if victim[0] != from_square)
+                material_swing = 0
+                own_king_destroyed = enemy_king_destroyed = False
+                for _, piece_code in destroyed:
+                    if piece_code // 6 == color:
+                        material_swing -= PIECE_VALUES[piece_code % 6]
+                        own_king_destroyed = own_king_destroyed or piece_code % 6 == KING
+                    else:
+                        material_swing += PIECE_VALUES[piece_code % 6]
+                        enemy_king_destroyed = enemy_king_destroyed or piece_code % 6 == KING
+
+                if moving_code % 6 == KING:
+                    reason = KING_CAPTURE
+                elif own_king_destroyed and enemy_king_destroyed:
+                    reason = BOTH_KINGS_EXPLODE
+                else:
+                    reason = MOVE_OK
+                outcomes.append(CaptureOutcome(from_square | to_square << 6 | MOVE_CAPTURE, tuple(destroyed),
+                                               material_swing, own_king_destroyed, enemy_king_destroyed, reason))
+
+        outcomes = tuple(outcomes)
+        if len(self._capture_outcomes) >= CAPTURE_CACHE_SIZE:
+            self._capture_outcomes.clear()
+        self._capture_outcomes[self._zobrist_key] = outcomes
+        return outcomes
+
+    def get_zobrist_key(self):
+        """
+        Returns the 64-bit Zobrist key of the current position (piece placement and whose turn it is).
+        """
+        return self._zobrist_key
+
+    def _put_piece(self, square, piece_code):
+        """
+        Places the piece with piece_code on an empty square of the bitboard backend.
+        """
+        bit = 1 << square
+        self._bitboards[piece_code] |= bit
+        self._occupancy[piece_code // 6] |= bit
+        self._mailbox[square] = piece_code
+
+    def _remove_piece(self, square):
+        """
+        Removes whatever piece sits on square of the bitboard backend and returns its piece code.
+        """
+        piece_code = self._mailbox[square]
+        bit = 1 << square
+        self._bitboards[piece_code] ^= bit
+        self._occupancy[piece_code // 6] ^= bit
+        self._mailbox[square] = None
+        return piece_code
+
+    def _bitboard_check_move(self, current_position, requested_position):
+        """
+        The bitboard backend's version of the checks in _list_check_move, with the same rules.
+        :return: MOVE_OK, or the reason code the move is rejected for.
+        """
+        current_square = self._parse_square(current_position)
+        if current_square is None or self._mailbox[current_square] is None:
+            return NO_PIECE
+
+        moving_piece = self._mailbox[current_square]
+        if COLOR_NAMES[moving_piece // 6] != self._player_turn:
+            return NOT_PLAYERS_PIECE
+
+        requested_square = SQUARE_INDICES.get(requested_position)
+        if (requested_square is None or
+                not piece_targets(current_square, moving_piece, self._occupancy) >> requested_square & 1):
+            return ILLEGAL_MOVE
+
+        if self._mailbox[requested_square] is not None:
+            if moving_piece % 6 == KING:
+                return KING_CAPTURE
+            if self._both_kings_explode(requested_square):
+                return BOTH_KINGS_EXPLODE
+
+        return MOVE_OK
+
+    def _parse_square(self, position):
+        """
+        Converts the algebraic notation of a piece's position into a square index.  Like the original
+        find_piece_at_position, the column may be given in upper case.
+        :return: Index (0-63) of the square, or None if position is not one of the 64 squares.
+        """
+        return SQUARE_INDICES.get(position[:1].lower() + position[1:])
+
+    def _explosion_victims(self, square):
+        """
+        Finds the pieces an explosion on square destroys besides the capturing and captured pieces:
+        every piece other than a Pawn in the 8 surrounding squares.
+        :return: List of their squares.
+        """
+        victims = []
+        for zone_square in EXPLOSION_ZONES[square]:
+            piece_code = self.get_piece_code_at(zone_square)
+            if piece_code is not None and piece_code % 6 != PAWN:
+                victims.append(zone_square)
+        return victims
+
+    def _both_kings_explode(self, square):
+        """
+        Returns True if a capture on square would destroy both Kings in one step, which is disallowed.
+        Kings are never spared by an explosion, so it is enough that both stand on or next to the square.
+        """
+        white_king, black_king = self._king_squares
+        if white_king is None or black_king is None:
+            return False
+        blast = EXPLOSION_MASKS[square] | 1 << square
+        return blast >> white_king & 1 == 1 and blast >> black_king & 1 == 1
+
+    def get_piece_code_at(self, square):
+        """
+        Returns the piece code (color * 6 + piece type) of the piece on square, or None, for either backend.
+        :param square: Index (0-63) of the square, see SQUARE_INDICES.
+        """
+        if self._backend == 'bitboard':
+            return self._mailbox[square]
+
+        row_index, column_index = SQUARE_CELLS[square]
+        obj_at_square = self._board[row_index][column_index]
+        if obj_at_square == '.':
+            return None
+        return piece_object_code(obj_at_square)
+
+    def _take_piece(self, square):
+        """
+        Removes the piece on square and returns it (a piece code for the bitboard backend,
+        the piece object for the list backend) so that it can be put back by _place_piece.
+        """
+        if self._backend == 'bitboard':
+            piece = self._remove_piece(square)
+            self._zobrist_key ^= ZOBRIST_PIECE_KEYS[piece][square]
+            self._track_piece(square, piece, False)
+            return piece
+
+        row_index, column_index = SQUARE_CELLS[square]
+        if self._shared_rows >> row_index & 1:
+            self._unshare_row(row_index)
+        piece = self._board[row_index][column_index]
+        self._board[row_index][column_index] = '.'
+        piece_code = piece_object_code(piece)
+        self._zobrist_key ^= ZOBRIST_PIECE_KEYS[piece_code][square]
+        self._track_piece(square, piece_code, False)
+        return piece
+
+    def _place_piece(self, square, piece):
+        """
+        Places a piece returned by _take_piece on an empty square.
+        """
+        if self._backend == 'bitboard':
+            self._put_piece(square, piece)
+            self._zobrist_key ^= ZOBRIST_PIECE_KEYS[piece][square]
+            self._track_piece(square, piece, True)
+            return
+
+        row_index, column_index = SQUARE_CELLS[square]
+        if self._shared_rows >> row_index & 1:
+            self._unshare_row(row_index)
+        self._board[row_index][column_index] = piece
+        piece_code = piece_object_code(piece)
+        self._zobrist_key ^= ZOBRIST_PIECE_KEYS[piece_code][square]
+        self._track_piece(square, piece_code, True)
+
+    def _unshare_row(self, row_index):
+        """
+        Gives this object its own copy of a row of self._board which may still be shared with a copy,
+        just before the row is changed.
+        """
+        self._board[row_index] = list(self._board[row_index])
+        self._shared_rows ^= 1 << row_index
+
+    def copy(self):
+        """
+        Returns an independent copy of the game, including its move history (so moves can be taken back
+        with pop() on either).  The list backend's rows are shared until one of the two games changes them,
+        so copying costs about the same as copying a few short lists, whatever the backend.
+        """
+        game = object.__new__(type(self))
+        game.__dict__.update(self.__dict__)
+
+        # Pieces are shared flyweights and the undo records are never changed, so the containers are
+        # all that needs copying.
+        game._undo_stack = list(self._undo_stack)
+        game._piece_lists = [dict(pieces) for pieces in self._piece_lists]
+        game._color_squares = list(self._color_squares)
+        game._king_squares = list(self._king_squares)
+        game._attacks_from = list(self._attacks_from)
+        if self._backend == 'bitboard':
+            game._bitboards = list(self._bitboards)
+            game._occupancy = list(self._occupancy)
+            game._mailbox = list(self._mailbox)
+        else:
+            game._board = list(self._board)
+            self._shared_rows = game._shared_rows = 0xFF
+        return game
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def _execute_move(self, from_square, to_square):
+        """
+        Moves the piece on from_square to to_square without checking the move, resolving any explosion,
+        updating the game state and passing the turn.  Only what the move changed is pushed onto
+        self._undo_stack: the moving piece, the captured piece, the exploded pieces, and the previous
+        turn and game state.
+        :param from_square: Index (0-63) of the piece being moved.
+        :param to_square: Index (0-63) the piece is moved to.
+        """
+        captured_code = self.get_piece_code_at(to_square)
+        moving_piece = self._take_piece(from_square)
+        captured_piece = None
+        exploded_pieces = []
+        previous_game_state = self._game_state
+
+        if captured_code is None:
+            self._place_piece(to_square, moving_piece)
+        else:
+            # The capturing piece and the captured piece are both removed, whatever their type,
+            # along with every piece other than a Pawn in the 8 surrounding squares.
+            captured_piece = self._take_piece(to_square)
+            destroyed_codes = [captured_code]
+            for square in self._explosion_victims(to_square):
+                destroyed_codes.append(self.get_piece_code_at(square))
+                exploded_pieces.append((square, self._take_piece(square)))
+
+            # Checks if a King was captured or exploded, and if so, designates the winner of the match
+            if KING in destroyed_codes:
+                self._game_state = 'BLACK_WON'
+            elif 6 + KING in destroyed_codes:
+                self._game_state = 'WHITE_WON'
+
+        self._undo_stack.append((from_square, to_square, moving_piece, captured_piece, exploded_pieces,
+                                 self._player_turn, previous_game_state))
+        self._player_turn = 'black' if self._player_turn == 'white' else 'white'
+        self._zobrist_key ^= ZOBRIST_BLACK_TO_MOVE
+
+    def push(self, move):
+        """
+        Makes a move returned by generate_legal_moves, without re-checking it or printing anything.
+        The move can be taken back with pop().
+        :param move: Encoded move (see encode_move).
+        """
+        self._execute_move(move & 63, move >> 6 & 63)
+
+    def pop(self):
+        """
+        Takes back the most recent move made by push() or make_move(), restoring the captured and
+        exploded pieces, the player whose turn it was and the game state.
+        """
+        (from_square, to_square, moving_piece, captured_piece, exploded_pieces,
+         self._player_turn, self._game_state) = self._undo_stack.pop()
+        self._zobrist_key ^= ZOBRIST_BLACK_TO_MOVE
+
+        if captured_piece is None:
+            self._take_piece(to_square)
+        else:
+            self._place_piece(to_square, captured_piece)
+            for square, piece in exploded_pieces:
+                self._place_piece(square, piece)
+        self._place_piece(from_square, moving_piece)
+
+    def get_board(self):
+        """
+        Returns the board as 8 lists (8th row first) of piece objects or '.', whichever backend is in use.
+        For the list backend this is the self._board private data member itself, so it should not be changed.
+        """
+        if self._backend == 'list':
+            return self._board
+
+        board_rows = []
+        for row in range(7, -1, -1):
+            board_row = []
+            for square in range(row * 8, row * 8 + 8):
+                piece_code = self._mailbox[square]
+                board_row.append('.' if piece_code is None else PIECE_OBJECTS[piece_code])
+            board_rows.append(board_row)
+        return board_rows
+
+    def get_game_state(self):
+        """
+        Returns the game_state private data member initialized and tracked in this ChessVar object.
+        """
+        return self._game_state
+
+    def get_player_turn(self):
+        """
+        Returns the player_turn private data member initialized and tracked in this ChessVar object.
+        """
+        return self._player_turn
+
+    def generate_legal_moves(self, table=None):
+        """
+        Generates every legal move for the player whose turn it is in a single pass over their pieces.
+        The atomic chess rules checked by make_move are already applied: Kings never capture, and no capture
+        may destroy both Kings in one explosion.
+        :param table: Optional TranspositionTable; move lists already stored for this position's Zobrist key
+        are reused, and newly generated ones are stored.
+        :return: List of encoded moves (see encode_move), empty once the game has been won.
+        """
+        if self._game_state != 'UNFINISHED':
+            return []
+
+        if table is not None:
+            moves = table.probe_moves(self._zobrist_key)
+            if moves is None:
+                moves = self.generate_legal_moves()
+                table.store_moves(self._zobrist_key, moves)
+            return list(moves)
+
+        if self._backend == 'bitboard':
+            bitboards, occupancy, mailbox = self._bitboards, self._occupancy, self._mailbox
+        else:
+            bitboards, occupancy, mailbox = self._list_board_to_bitboards()
+
+        color = WHITE if self._player_turn == 'white' else BLACK
+        occupied = occupancy[WHITE] | occupancy[BLACK]
+
+        # An explosion destroys a King when it is centred on or next to it, so capturing on any square
+        # in both Kings' 3x3 zones would destroy both Kings.
+        double_king_zone = FULL_BOARD
+        for king_square in self._king_squares:
+            if king_square is not None:
+                double_king_zone &= EXPLOSION_MASKS[king_square] | 1 << king_square
+            else:
+                double_king_zone = 0
+
+        moves = []
+        for square in iterate_bits(occupancy[color]):
+            piece_code = mailbox[square]
+            targets = piece_targets(square, piece_code, occupancy)
+
+            for target in iterate_bits(targets & ~occupied):
+                moves.append(square | target << 6)
+
+            # Kings are not allowed to capture other pieces.
+            if piece_code % 6 != KING:
+                for target in iterate_bits(targets & occupied & ~double_king_zone):
+                    moves.append(square | target << 6 | MOVE_CAPTURE)
+
+        return moves
+
+    def make_move(self, current_position, requested_position):
+        """
+        Allows the player to make permissible moves on the atomic chess board.
+        Unlike standard chess, there is no check or checkmate, no castling, en passant, or pawn promotion.
+        Messages about rejected moves, captures and winners go to the message hook (print by default).
+        :param current_position: Algebraic notation of a piece which the player would like to move.
+        :param requested_position: Algebraic notation of a location the player would like to move the piece to.
+        :return: True or False, depending on if this is a legal move based on the assignment requirements.
+        In headless mode, the MoveResult from play_move instead.
+        """
+        result = self.play_move(current_position, requested_position)
+        if self._headless:
+            return result
+        return result.applied
+
+    def check_move(self, current_position, requested_position):
+        """
+        Checks a move the way make_move does, without making it or sending any messages.
+        :param current_position: Algebraic notation of a piece which the player would like to move.
+        :param requested_position: Algebraic notation of a location the player would like to move the piece to.
+        :return: MOVE_OK, or the reason code the move would be rejected for.
+        """
+        # Check to see if the game has already been won, if so the move is rejected
+        if self._game_state != 'UNFINISHED':
+            return GAME_ALREADY_WON
+
+        if self._backend == 'bitboard':
+            return self._bitboard_check_move(current_position, requested_position)
+        return self._list_check_move(current_position, requested_position)
+
+    def play_move(self, current_position, requested_position):
+        """
+        Checks and makes a move like make_move, but always describes the outcome with a MoveResult.
+        Messages go to the message hook only: print unless another hook was given, none in headless mode.
+        :param current_position: Algebraic notation of a piece which the player would like to move.
+        :param requested_position: Algebraic notation of a location the player would like to move the piece to.
+        :return: MoveResult saying whether the move was made, why not, which squares exploded,
+        and the resulting game state.
+        """
+        reason = self.check_move(current_position, requested_position)
+        if reason == GAME_ALREADY_WON:
+            return MoveResult(False, GAME_ALREADY_WON, (), self._game_state)
+
+        if reason != MOVE_OK:
+            if self._message_hook is not None:
+                self._message_hook(REJECTION_MESSAGES[reason])
+            return MoveResult(False, reason, (), self._game_state)
+
+        # Makes the move (recorded on the undo stack) and passes the turn
+        current_square = SQUARE_INDICES[current_position[0].lower() + current_position[1]]
+        requested_square = SQUARE_INDICES[requested_position]
+        captured_code = self.get_piece_code_at(requested_square)
+        self._execute_move(current_square, requested_square)
+
+        if captured_code is None:
+            return MoveResult(True, MOVE_OK, (), self._game_state)
+
+        # If a piece was captured by that move, it's explosion time!
+        exploded_pieces = self._undo_stack[-1][4]
+        exploded_squares = (requested_position,) + tuple(SQUARE_NAMES[square] for square, _ in exploded_pieces)
+        if self._message_hook is not None:
+            self._message_hook("\nCaptured piece at " + requested_position + "! (Explosion in surrounding 8 cells)")
+
+            # Announces the winner if the explosion (rather than the capture itself) destroyed a King
+            if captured_code % 6 != KING:
+                if self._game_state == 'BLACK_WON':
+                    self._message_hook("Black wins")
+                elif self._game_state == 'WHITE_WON':
+                    self._message_hook("White wins")
+
+        return MoveResult(True, MOVE_OK, exploded_squares, self._game_state)
+
+    def _list_check_move(self, current_position, requested_position):
+        """
+        Checks a move requested through make_move against the list backend.
+        :param current_position: Algebraic notation of a piece which the player would like to move.
+        :param requested_position: Algebraic notation of a location the player would like to move the piece to.
+        :return: MOVE_OK, or the reason code the move is rejected for.
+        """
+
+        def find_piece_at_position(position):
+            """
+            Convert the position into a recognizable index in the self._board private data member.
+            Returns the chess piece object found at the index (if applicable).  Otherwise, None is returned.
+            :param position: Algebraic position of a location on the atomic chess board.
+            :return: ChessPiece-related object found at the requested position (if applicable).
+            """
+
+            # The position must be one of the 64 algebraic square names (the column may be given in upper case).
+            square = self._parse_square(position)
+            if square is not None:
+                # Find the row of the object being moved, then the specific object being moved.
+                row_index, column_index = SQUARE_CELLS[square]
+                obj_being_moved = self._board[row_index][column_index]
+
+                # If the object is a from a user-defined ChessPiece or related class.
+                if isinstance(obj_being_moved, ChessPiece):
+                    # Return the ChessPiece-related object being moved.
+                    return obj_being_moved
+
+        # Finds the pieces at current_position (if applicable)
+        # If there is no piece_at_current_position, then reject the move
+        piece_at_current_position = find_piece_at_position(current_position)
+        if piece_at_current_position is None or piece_at_current_position == '.':
+            return NO_PIECE
+
+        # Check if the moving the piece belongs to the player whose turn it is
+        # If the moving piece does not belong to the player, then reject the move
+        if piece_at_current_position.get_color() != self._player_turn:
+            return NOT_PLAYERS_PIECE
+
+        # Check to see if the requested move is legal (pieces don't know their position, the board does)
+        current_square = self._parse_square(current_position)
+        legal_moves = piece_at_current_position.get_chess_piece_moves(self._board, current_square)
+        if requested_position not in legal_moves:
+            # Pawns are the only piece which Move vs Capture, so check if the requested position is a Capture instead
+            if isinstance(piece_at_current_position, Pawn):
+                legal_captures = piece_at_current_position.get_chess_piece_captures(self._board, current_square)
+                # If the requested move is not a legal capture for the Pawn, reject it
+                if requested_position not in legal_captures:
+                    return ILLEGAL_MOVE
+
+            # If the piece_at_current_position is not a Pawn, reject the move
+            else:
+                return ILLEGAL_MOVE
+
+        # Record the piece at the requested position before a move is made
+        piece_at_position_being_moved_to = find_piece_at_position(requested_position)
+
+        # If the piece being moved is a King, and it would capture another piece, reject the move
+        if (isinstance(piece_at_position_being_moved_to, (ChessPiece, Pawn, Rook, Knight, Bishop, Queen)) and
+                isinstance(piece_at_current_position, King)):
+            return KING_CAPTURE
+
+        # If the move would kill both Kings in one step, disallow this per requirements
+        if piece_at_position_being_moved_to is not None and self._both_kings_explode(
+                SQUARE_INDICES[requested_position]):
+            return BOTH_KINGS_EXPLODE
+
+        # The move is legal based on the assignment requirements
+        return MOVE_OK
+
+    def print_board(self):
+        """
+        Prints the current state of the atomic chess board based on the positions
+        of the pieces recorded in self._board private data member.
+        The terminal rendering (and termcolor) is only loaded the first time a board is drawn.
+        """
+        from render import print_board
+        print_board(self)
+
+
+class ChessPiece:
+    """
+    Defines common attributes and methods for chess pieces.  ChessPiece itself is abstract: create one of its
+    subclasses (Pawn, Knight, ...).
+    Pieces are flyweights: the board holds one shared object per piece type and color (see PIECE_OBJECTS),
+    and the piece itself keeps nothing but its piece code.  Where a piece stands is known only to the board,
+    so methods which need it take the square.
+    """
+    __slots__ = ('_code',)
+    _name = ''
+    _piece_type = None
+
+    # Directions (row, column) a sliding piece moves in, see get_chess_piece_moves.
+    _move_directions = ()
+
+    def __init__(self, color):
+        """
+        Defines common attributes for chess pieces.
+        :param color: 'white' or 'black'.
+        """
+        if self._piece_type is None:
+            raise TypeError("ChessPiece is abstract; use a subclass")
+        self._code = COLOR_NAMES.index(color) * 6 + self._piece_type
+
+    def __copy__(self):
+        """
+        Pieces are shared and never change, so copies of a board keep the same piece objects.
+        """
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        """
+        Unpickles to the shared piece object of the same piece code.
+        """
+        return piece_for_code, (self._code,)
+
+    def get_color(self):
+        """
+        Returns the color of this ChessPiece object, 'white' or 'black'.
+        """
+        return COLOR_NAMES[self._code // 6]
+
+    def get_name(self):
+        """
+        Returns the _name private data member of this ChessPiece object's class.
+        """
+        return self._name
+
+    def get_piece_code(self):
+        """
+        Returns the piece code (color * 6 + piece type) of this ChessPiece object.
+        """
+        return self._code
+
+    def get_chess_piece_moves(self, board_obj, square):
+        """
+        Calculates the legal moves for a sliding piece (Rook, Bishop or Queen): any number of squares along
+        each of its directions until it is blocked, capturing the blocking piece if it is the other color's.
+        The other pieces override this method.
+        :param board_obj: The board object (list) containing sub-lists (chess board rows) whose indices contain
+        the chess pieces currently at their respective positions on the board.
+        :param square: Index (0-63) of the square the piece stands on.
+        :return: A list of legal moves (algebraic notation) for the piece to make.
+        """
+        row, column = divmod(square, 8)
+        color = self.get_color()
+        moves = []
+
+        for direction_row, direction_column in self._move_directions:
+            r_temp, c_temp = row + direction_row, column + direction_column
+
+            while 0 <= r_temp <= 7 and 0 <= c_temp <= 7:
+                obj_at_target = board_obj[7 - r_temp][c_temp]
+                if obj_at_target == '.':
+                    moves.append(SQUARE_NAMES[r_temp * 8 + c_temp])
+                elif obj_at_target.get_color() != color:
+                    moves.append(SQUARE_NAMES[r_temp * 8 + c_temp])
+                    break
+                else:
+                    break
+
+                r_temp += direction_row
+                c_temp += direction_column
+
+        return moves
+
+
+class Pawn(ChessPiece):
+    """
+    Defines attributes and methods surrounding the Pawn piece.
+    """
+    __slots__ = ()
+    _name = 'P'
+    _piece_type = PAWN
+
+    def get_chess_piece_moves(self, board_obj, square):
+        """
+        Calculates the legal moves for a Pawn and returns those possible moves for comparison elsewhere.
+        :param board_obj: The board object (list) containing sub-lists (chess board rows) whose indices contain
+        the chess pieces currently at their respective positions on the board.
+        :param square: Index (0-63) of the square the Pawn stands on.
+        :return: A list of legal moves for the Pawn to make.
+        """
+        row, column = divmod(square, 8)
+
+        # Creates a blank list to store the legal moves and determines the direction of movement from piece color
+        moves = []
+        direction = 1 if self._code < 6 else -1
+
+        # Standard move is one square forward for a Pawn
+        if 0 <= row + direction <= 7 and board_obj[7 - (row + direction)][column] == '.':
+            moves.append(SQUARE_NAMES[square + 8 * direction])
+
+            # Pawn can move two squares forward from its starting row (if that is requested)
+            if row == (1 if direction == 1 else 6) and board_obj[7 - (row + 2 * direction)][column] == '.':
+                moves.append(SQUARE_NAMES[square + 16 * direction])
+
+        # Returns the list of legal moves for the Pawn object
+        return moves
+
+    def get_chess_piece_captures(self, board_obj, square):
+        """
+        Because the Pawn is the only chess piece which moves and captures separately, this additional method
+        is built for the Pawn class to denote positions which can be captured on the board (diagonally forward
+        left and right by one space).
+        :param board_obj: Object containing the contents of the atomic chess board.
+        :param square: Index (0-63) of the square the Pawn stands on.
+        :return: A list of legal captures for the Pawn to make.
+        """
+        captures = []
+
+        # Finds the board locations which the Pawn can capture (diagonally forward left and right one square)
+        for target in PAWN_CAPTURE_TARGETS[self._code // 6][square]:
+            row_index, column_index = SQUARE_CELLS[target]
+            if isinstance(board_obj[row_index][column_index], ChessPiece):
+                captures.append(SQUARE_NAMES[target])
+
+        # Returns the list of legal captures for the Pawn object
+        return captures
+
+
+class Rook(ChessPiece):
+    """
+    Defines attributes and methods surrounding the Rook piece, which slides up, down, right and left.
+    """
+    __slots__ = ()
+    _name = 'R'
+    _piece_type = ROOK
+    _move_directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class Knight(ChessPiece):
+    """
+    Defines attributes and methods surrounding the Knight piece.
+    """
+    __slots__ = ()
+    _name = 'N'
+    _piece_type = KNIGHT
+
+    def get_chess_piece_moves(self, board_obj, square):
+        """
+        Calculates the legal moves for a Knight and returns those possible moves for comparison elsewhere.
+        :param board_obj: The board object (list) containing sub-lists (chess board rows) whose indices contain
+        the chess pieces currently at their respective positions on the board.
+        :param square: Index (0-63) of the square the Knight stands on.
+        :return: A list of legal moves for the Knight to make.
+        """
+        return _step_moves(self, board_obj, KNIGHT_TARGETS[square])
+
+
+class Bishop(ChessPiece):
+    """
+    Defines attributes and methods surrounding the Bishop piece, which slides diagonally.
+    """
+    __slots__ = ()
+    _name = 'B'
+    _piece_type = BISHOP
+    _move_directions = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class Queen(ChessPiece):
+    """
+    Defines attributes and methods surrounding the Queen piece, which slides like the Rook and the Bishop.
+    """
+    __slots__ = ()
+    _name = 'Q'
+    _piece_type = QUEEN
+    _move_directions = Rook._move_directions + Bishop._move_directions
+
+
+class King(ChessPiece):
+    """
+    Defines attributes and methods surrounding the King piece.
+    """
+    __slots__ = ()
+    _name = 'K'
+    _piece_type = KING
+
+    def get_chess_piece_moves(self, board_obj, square):
+        """
+        Calculates the legal moves for a King and returns those possible moves for comparison elsewhere.
+        :param board_obj: The board object (list) containing sub-lists (chess board rows) whose indices contain
+        the chess pieces currently at their respective positions on the board.
+        :param square: Index (0-63) of the square the King stands on.
+        :return: A list of legal moves for the King to make.
+        """
+        return _step_moves(self, board_obj, KING_TARGETS[square])
+
+
+def _step_moves(piece, board_obj, targets):
+    """
+    Keeps the target squares (from a precomputed table) of a Knight or King which are empty or hold
+    a piece of the other color.
+    :return: A list of legal moves in algebraic notation.
+    """
+    color = piece.get_color()
+    moves = []
+    for target in targets:
+        row_index, column_index = SQUARE_CELLS[target]
+        obj_at_target = board_obj[row_index][column_index]
+        if obj_at_target == '.' or obj_at_target.get_color() != color:
+            moves.append(SQUARE_NAMES[target])
+    return moves
+
+
+# Piece classes indexed by piece type.
+PIECE_CLASSES = (Pawn, Knight, Bishop, Rook, Queen, King)
+
+# The shared piece objects, indexed by piece code (color * 6 + piece type).
+PIECE_OBJECTS = tuple(PIECE_CLASSES[piece_code % 6](COLOR_NAMES[piece_code // 6]) for piece_code in range(12))
+
+
+def piece_for_code(piece_code):
+    """
+    Returns the shared piece object for a piece code.
+    """
+    return PIECE_OBJECTS[piece_code]
+
+
+def main():
+    """
+    Starts an interactive game of atomic chess in the terminal (see cli.py).
+    """
+    from cli import main as play_in_terminal
+    play_in_terminal()
+
+if __name__ == '__main__':
+    main()
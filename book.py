@@ -0,0 +1,235 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Opening book for atomic chess: compiled from games into a sorted binary file, read through mmap.
+
+import argparse
+import mmap
+import struct
+import sys
+import time
+from collections import namedtuple
+
+from ChessVar import ChessVar, MOVE_OK, SQUARE_INDICES, encode_move, move_to_positions
+
+# File layout: a header, then fixed-size records sorted by (Zobrist key, move).
+#   header: magic, format version, record size, number of records
+#   record: Zobrist key of the position, encoded move, games, wins and losses for the player making the move
+HEADER = struct.Struct('<4sHHQ')
+RECORD = struct.Struct('<QHIII')
+MAGIC = b'ATBK'
+VERSION = 1
+
+# Only this many plies of each game go into the book by default.
+DEFAULT_BOOK_PLIES = 16
+
+
+class BookEntry(namedtuple('BookEntry', ['move', 'games', 'wins', 'draws', 'losses'])):
+    """
+    Statistics of one book move.
+    move: Encoded move (see ChessVar.encode_move).
+    games: Games in which the move was played in this position.
+    wins, draws, losses: Results of those games for the player making the move (draws include unfinished games).
+    """
+    __slots__ = ()
+
+    def get_score(self):
+        """
+        Returns the share of points the move scored, counting a draw as half a point.
+        """
+        return (self.wins + 0.5 * self.draws) / self.games if self.games else 0.0
+
+
+def replay_for_book(moves, max_plies):
+    """
+    Replays one game, collecting the positions and moves of its first plies.
+    :param moves: List of (current position, requested position) pairs.
+    :param max_plies: Number of plies to collect.
+    :return: Tuple of (list of (Zobrist key, encoded move, color index of the mover) triples, final game state),
+    or None if the game contains an illegal move.
+    """
+    game = ChessVar(backend='bitboard', headless=True)
+    collected = []
+    for current_position, requested_position in moves:
+        if requested_position is None or game.check_move(current_position, requested_position) != MOVE_OK:
+            return None
+        to_square = SQUARE_INDICES[requested_position]
+        move = encode_move(SQUARE_INDICES[current_position[0].lower() + current_position[1]], to_square,
+                           game.get_piece_code_at(to_square) is not None)
+        if len(collected) < max_plies:
+            collected.append((game.get_zobrist_key(), move, 0 if game.get_player_turn() == 'white' else 1))
+        game.push(move)
+    return collected, game.get_game_state()
+
+
+def build_book(games, path, max_plies=DEFAULT_BOOK_PLIES, min_games=1):
+    """
+    Compiles move statistics from games into a book file.
+    :param games: Iterable of games, each a list of (current position, requested position) pairs
+    (see replay.parse_game).  Games containing an illegal move are skipped.
+    :param path: File to write.
+    :param max_plies: Plies of each game which go into the book.
+    :param min_games: Moves played in fewer games than this are left out.
+    :return: Tuple of (games used, games skipped, records written).
+    """
+    statistics = {}
+    used = skipped = 0
+    for moves in games:
+        replayed = replay_for_book(moves, max_plies)
+        if replayed is None:
+            skipped += 1
+            continue
+        used += 1
+        collected, game_state = replayed
+        winner = {'WHITE_WON': 0, 'BLACK_WON': 1}.get(game_state)
+        for key, move, mover in collected:
+            counts = statistics.get((key, move))
+            if counts is None:
+                counts = statistics[(key, move)] = [0, 0, 0]
+            counts[0] += 1
+            if winner is not None:
+                counts[1 if winner == mover else 2] += 1
+
+    records = sorted((key, move, counts) for (key, move), counts in statistics.items() if counts[0] >= min_games)
+    with open(path, 'wb') as book_file:
+        book_file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(records)))
+        for key, move, (played, wins, losses) in records:
+            book_file.write(RECORD.pack(key, move, played, wins, losses))
+    return used, skipped, len(records)
+
+
+class OpeningBook:
+    """
+    Reads a book file through a read-only memory map, so the records stay in the operating system's page cache
+    (shared by every process reading the same file) rather than in the Python heap.  Positions are found by
+    binary search on the sorted Zobrist keys.
+    """
+
+    def __init__(self, path):
+        """
+        Opens a book file written by build_book.
+        """
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file can't be mapped.
+            self._file.close()
+            raise ValueError("Not an opening book: " + path)
+
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError("Not an opening book: " + path)
+        magic, version, record_size, self._count = HEADER.unpack_from(self._map, 0)
+        if (magic != MAGIC or version != VERSION or record_size != RECORD.size or
+                len(self._map) < HEADER.size + self._count * RECORD.size):
+            self.close()
+            raise ValueError("Not an opening book, or an unsupported version: " + path)
+
+    def __len__(self):
+        """
+        Returns the number of (position, move) records in the book.
+        """
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Releases the memory map and the file.
+        """
+        self._map.close()
+        self._file.close()
+
+    def _key_at(self, index):
+        return struct.unpack_from('<Q', self._map, HEADER.size + index * RECORD.size)[0]
+
+    def lookup(self, position):
+        """
+        Finds the book moves of a position.
+        :param position: ChessVar object, or a Zobrist key.
+        :return: List of BookEntry, most played first; empty if the position isn't in the book.
+        """
+        key = position if isinstance(position, int) else position.get_zobrist_key()
+
+        # Binary search for the first record of the key.
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        entries = []
+        index = low
+        while index < self._count:
+            record_key, move, played, wins, losses = RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+            if record_key != key:
+                break
+            entries.append(BookEntry(move, played, wins, played - wins - losses, losses))
+            index += 1
+        entries.sort(key=lambda entry: -entry.games)
+        return entries
+
+    def choose_move(self, game, rng=None, min_games=1):
+        """
+        Picks a book move for the player whose turn it is, checked against the game's legal moves.
+        :param game: ChessVar object.
+        :param rng: random.Random object; if given, moves are drawn in proportion to how often they were played,
+        otherwise the most played move is returned.
+        :param min_games: Moves played in fewer games are ignored.
+        :return: Encoded move, or None if the book has nothing for this position.
+        """
+        legal_moves = set(game.generate_legal_moves())
+        entries = [entry for entry in self.lookup(game) if entry.games >= min_games and entry.move in legal_moves]
+        if not entries:
+            return None
+        if rng is None:
+            return entries[0].move
+        return rng.choices([entry.move for entry in entries], [entry.games for entry in entries])[0]
+
+
+def main():
+    from replay import parse_game, read_games
+
+    parser = argparse.ArgumentParser(description="Build or query an atomic chess opening book.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="compile a book from a file of games")
+    build_parser.add_argument('games', help="one game per line, as read by replay.py")
+    build_parser.add_argument('book')
+    build_parser.add_argument('--plies', type=int, default=DEFAULT_BOOK_PLIES)
+    build_parser.add_argument('--min-games', type=int, default=1)
+    query_parser = subparsers.add_parser('query', help="list the book moves after a line of moves")
+    query_parser.add_argument('book')
+    query_parser.add_argument('--moves', default='', help="e.g. 'e2e4 e7e5'")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        with open(args.games) as games_file:
+            games = (parse_game(line) for _, line in read_games(games_file))
+            used, skipped, records = build_book(games, args.book, args.plies, args.min_games)
+        print("{} games used, {} with illegal moves skipped, {} book records written in {:.1f}s".format(
+            used, skipped, records, time.perf_counter() - start))
+        return 0
+
+    from perft import play_line
+    game = play_line(args.moves)
+    with OpeningBook(args.book) as book:
+        entries = book.lookup(game)
+        if not entries:
+            print("Position not in book.", file=sys.stderr)
+            return 1
+        for entry in entries:
+            print("{:<6} games {:>8}  +{} ={} -{}  score {:.3f}".format(
+                ''.join(move_to_positions(entry.move)), entry.games, entry.wins, entry.draws, entry.losses,
+                entry.get_score()))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Command line interface for playing a game of atomic chess in the terminal.
+
+import argparse
+
+from ChessVar import ChessVar, move_to_positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a game of atomic chess in the terminal.")
+    parser.add_argument('--computer', choices=['white', 'black'], default=None,
+                        help="let the search engine play this color")
+    parser.add_argument('--think-time', type=float, default=3.0,
+                        help="seconds the computer may think about each move")
+    parser.add_argument('--book', default=None, help="opening book file (see book.py) the computer plays from")
+    args = parser.parse_args()
+
+    book = None
+    if args.book is not None:
+        from book import OpeningBook
+        book = OpeningBook(args.book)
+
+    game = ChessVar(backend='bitboard' if args.computer else 'list')
+    print("Welcome to Atomic Chess!\nWritten by github.com/sonnenco (2024)")
+
+    while game.get_game_state() == 'UNFINISHED':
+        game.print_board()
+        print("It is " + game.get_player_turn() + "'s turn.")
+
+        if game.get_player_turn() == args.computer:
+            from search import find_best_move
+            best_move = book.choose_move(game) if book is not None else None
+            if best_move is None:
+                best_move = find_best_move(game, args.think_time)
+            if best_move is None:
+                print("The computer has no legal moves.")
+                break
+            current_space, requested_space = move_to_positions(best_move)
+            print("The computer moves " + current_space + " to " + requested_space + ".")
+        else:
+            print("Cell to move from? (e.g., a1, d5)")
+            current_space = input()
+            print("Where to move?")
+            requested_space = input()
+        game.make_move(current_space, requested_space)
+
+    if game.get_game_state() == 'UNFINISHED':
+        print("\nNo more moves can be made. Final board:")
+    else:
+        print("\nWe have a winner! Final board:")
+    game.print_board()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Turns batches of atomic chess positions into NumPy arrays for training data, with sharded .npy output.
+
+import argparse
+import itertools
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from ChessVar import Position, PAWN, load_fens
+
+# Number of positions written to each shard by default.
+DEFAULT_SHARD_SIZE = 100000
+
+
+class FeatureBatch(namedtuple('FeatureBatch', ['planes', 'side_to_move', 'material', 'enemy_pieces_in_zone'])):
+    """
+    Arrays describing N positions.  Squares are laid out as in the rest of the engine: plane[row][column]
+    is square row * 8 + column, so row 0 is the 1st row and column 0 the a column.
+    planes: uint8 array (N, 12, 8, 8), 1 where a piece of that piece code (color * 6 + piece type) stands.
+    side_to_move: uint8 array (N,), 0 for white and 1 for black.
+    material: int16 array (N, 12), the number of pieces of each piece code.
+    enemy_pieces_in_zone: int8 array (N, 8, 8), for each piece the number of enemy pieces other than
+    Pawns in the 8 squares around it (which a capture on its square would explode), 0 on empty squares.
+    """
+    __slots__ = ()
+
+
+def positions_to_arrays(positions):
+    """
+    Collects positions into arrays.
+    :param positions: Iterable of Positions (see ChessVar.parse_fen) or ChessVar objects.
+    :return: Tuple of (uint64 array (N, 12) of bitboards, uint8 array (N,) of sides to move).
+    """
+    bitboards, sides = [], []
+    for position in positions:
+        if not isinstance(position, Position):
+            position = position.get_position()
+        bitboards.append(position.bitboards)
+        sides.append(position.player_turn)
+    return np.array(bitboards, dtype=np.uint64).reshape(-1, 12), np.array(sides, dtype=np.uint8)
+
+
+def bitboards_to_planes(bitboards):
+    """
+    Unpacks bitboards into piece planes.
+    :param bitboards: uint64 array (N, 12).
+    :return: uint8 array (N, 12, 8, 8).
+    """
+    # Each little-endian bitboard is 8 bytes, one per row, with the a column in the lowest bit.
+    rows = np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8).reshape(-1, 12, 8)
+    return np.unpackbits(rows, axis=-1, bitorder='little').reshape(-1, 12, 8, 8)
+
+
+def count_neighbours(planes):
+    """
+    Counts, for every square, the set squares among the 8 squares around it.
+    :param planes: Array (..., 8, 8) of 0s and 1s.
+    :return: int8 array of the same shape.
+    """
+    padded = np.zeros(planes.shape[:-2] + (10, 10), dtype=np.int8)
+    padded[..., 1:9, 1:9] = planes
+    counts = np.zeros(planes.shape, dtype=np.int8)
+    for row_offset in (0, 1, 2):
+        for column_offset in (0, 1, 2):
+            if row_offset != 1 or column_offset != 1:
+                counts += padded[..., row_offset:row_offset + 8, column_offset:column_offset + 8]
+    return counts
+
+
+def encode_batch(positions):
+    """
+    Computes every feature of a batch of positions at once.
+    :param positions: Iterable of Positions or ChessVar objects.
+    :return: FeatureBatch.
+    """
+    bitboards, side_to_move = positions_to_arrays(positions)
+    planes = bitboards_to_planes(bitboards)
+    material = planes.sum(axis=(2, 3), dtype=np.int16)
+
+    # Pieces of each color, and pieces of each color which an explosion destroys (all but Pawns).
+    by_color = planes.reshape(-1, 2, 6, 8, 8)
+    occupied = by_color.sum(axis=2, dtype=np.int8)
+    non_pawns = occupied - by_color[:, :, PAWN]
+    non_pawns_around = count_neighbours(non_pawns)
+
+    # White pieces count the black pieces around them, and black pieces the white ones.
+    enemy_pieces_in_zone = occupied[:, 0] * non_pawns_around[:, 1] + occupied[:, 1] * non_pawns_around[:, 0]
+
+    return FeatureBatch(planes, side_to_move, material, enemy_pieces_in_zone)
+
+
+def write_shards(positions, output_directory, shard_size=DEFAULT_SHARD_SIZE, prefix='positions'):
+    """
+    Encodes positions shard by shard, saving each array of each shard to its own .npy file
+    (e.g. positions-00000-planes.npy).  Only one shard is held in memory at a time.
+    :param positions: Iterable of Positions or ChessVar objects, read lazily.
+    :param output_directory: Directory the shards are written to; created if needed.
+    :param shard_size: Number of positions per shard.
+    :param prefix: Start of every file name.
+    :return: Generator of (shard file name prefix, number of positions in the shard) pairs, one per shard
+    once it has been written.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    positions = iter(positions)
+    for shard_index in itertools.count():
+        shard = list(itertools.islice(positions, shard_size))
+        if not shard:
+            return
+        shard_prefix = os.path.join(output_directory, '{}-{:05d}'.format(prefix, shard_index))
+        batch = encode_batch(shard)
+        for name, array in batch._asdict().items():
+            np.save(shard_prefix + '-' + name + '.npy', array)
+        yield shard_prefix, len(shard)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write NumPy training arrays for a file of FEN positions.")
+    parser.add_argument('positions', help="file with one FEN position per line")
+    parser.add_argument('--output-dir', default='shards')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument('--prefix', default='positions')
+    args = parser.parse_args()
+
+    total = 0
+    start = time.perf_counter()
+    with open(args.positions) as fen_file:
+        for shard_prefix, count in write_shards(load_fens(fen_file), args.output_dir, args.shard_size, args.prefix):
+            total += count
+            print("{}: {} positions".format(shard_prefix, count))
+
+    seconds = time.perf_counter() - start
+    print("{} positions in {:.1f}s ({:.0f} positions/s)".format(total, seconds, total / seconds if seconds > 0 else 0))
+
+
+if __name__ == '__main__':
+    main()
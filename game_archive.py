@@ -0,0 +1,304 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Compact binary archive of atomic chess games (2 bytes per move) with an index for random access.
+
+import argparse
+import mmap
+import struct
+import sys
+import time
+from array import array
+from collections import namedtuple
+
+from ChessVar import COLOR_NAMES, ChessVar, MOVE_OK, SQUARE_INDICES, SQUARE_NAMES, encode_move, move_to_positions
+
+# File layout: a header, the games one after another, then the index.
+#   header: magic, format version, number of games, file offset of the index
+#   game: result, number of plies, then one 16-bit move per ply (from square | to square << 6)
+#   index: file offset of each game, 64 bits each
+HEADER = struct.Struct('<4sHxxQQ')
+GAME_HEADER = struct.Struct('<HH')
+INDEX_ENTRY = struct.Struct('<Q')
+MAGIC = b'ATGA'
+VERSION = 1
+
+# Results are stored as their position in this tuple.
+RESULTS = ('UNFINISHED', 'WHITE_WON', 'BLACK_WON')
+
+# Longest game a record can hold.
+MAX_PLIES = 0xFFFF
+
+
+class ArchivedGame(namedtuple('ArchivedGame', ['result', 'moves'])):
+    """
+    One game read from an archive.
+    result: Game state the game ended in (see RESULTS).
+    moves: array of encoded moves (see ChessVar.encode_move, without the capture flag), which ChessVar.push takes.
+    """
+    __slots__ = ()
+
+
+class GameArchiveWriter:
+    """
+    Writes games to an archive file one at a time; the index and header are written by close().
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        self._offsets = array('Q')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_game(self, moves, result):
+        """
+        Appends a game.
+        :param moves: Encoded moves (e.g. from generate_legal_moves); the capture flag is dropped.
+        :param result: Game state the game ended in, e.g. 'WHITE_WON'.
+        :return: Index of the game in the archive.
+        """
+        moves = array('H', (move & 0xFFF for move in moves))
+        if len(moves) > MAX_PLIES:
+            raise ValueError("Games longer than {} plies can't be archived".format(MAX_PLIES))
+        if sys.byteorder != 'little':
+            moves.byteswap()
+        self._offsets.append(self._file.tell())
+        self._file.write(GAME_HEADER.pack(RESULTS.index(result), len(moves)))
+        self._file.write(moves.tobytes())
+        return len(self._offsets) - 1
+
+    def close(self):
+        """
+        Writes the index and the header, and closes the file.
+        """
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        offsets = array('Q', self._offsets)
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        self._file.write(offsets.tobytes())
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, len(self._offsets), index_offset))
+        self._file.close()
+
+
+class GameArchive:
+    """
+    Reads an archive through a read-only memory map.  Any game, or any ply of a game, is found through the
+    index without reading the games before it.
+    """
+
+    def __init__(self, path):
+        """
+        Opens an archive written by GameArchiveWriter.
+        """
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file can't be mapped.
+            self._file.close()
+            raise ValueError("Not a game archive: " + path)
+
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError("Not a game archive: " + path)
+        magic, version, self._count, self._index_offset = HEADER.unpack_from(self._map, 0)
+        if (magic != MAGIC or version != VERSION or
+                len(self._map) < self._index_offset + self._count * INDEX_ENTRY.size):
+            self.close()
+            raise ValueError("Not a game archive, or an unsupported version: " + path)
+
+    def __len__(self):
+        """
+        Returns the number of games in the archive.
+        """
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Releases the memory map and the file.
+        """
+        self._map.close()
+        self._file.close()
+
+    def _game_offset(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError("No game {} in an archive of {} games".format(index, self._count))
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + index * INDEX_ENTRY.size)[0]
+
+    def get_result(self, index):
+        """
+        Returns the game state game index ended in.
+        """
+        return RESULTS[GAME_HEADER.unpack_from(self._map, self._game_offset(index))[0]]
+
+    def get_ply_count(self, index):
+        """
+        Returns the number of plies of game index.
+        """
+        return GAME_HEADER.unpack_from(self._map, self._game_offset(index))[1]
+
+    def get_move(self, index, ply):
+        """
+        Returns one move of a game.
+        :param index: Game index, counting from 0.
+        :param ply: Ply of the game, counting from 0 (white's first move).
+        :return: Encoded move.
+        """
+        offset = self._game_offset(index)
+        if not 0 <= ply < GAME_HEADER.unpack_from(self._map, offset)[1]:
+            raise IndexError("No ply {} in game {}".format(ply, index))
+        return struct.unpack_from('<H', self._map, offset + GAME_HEADER.size + 2 * ply)[0]
+
+    def get_game(self, index):
+        """
+        Reads one game.
+        :return: ArchivedGame.
+        """
+        offset = self._game_offset(index)
+        result, plies = GAME_HEADER.unpack_from(self._map, offset)
+        start = offset + GAME_HEADER.size
+        moves = array('H', self._map[start:start + 2 * plies])
+        if sys.byteorder != 'little':
+            moves.byteswap()
+        return ArchivedGame(RESULTS[result], moves)
+
+    def __iter__(self):
+        """
+        Yields every game, as ArchivedGame, in order.
+        """
+        for index in range(self._count):
+            yield self.get_game(index)
+
+
+def replay_archived_game(archive, index, plies=None, backend='bitboard', verify=False):
+    """
+    Replays a game from an archive, feeding its moves straight into ChessVar.push.
+    :param archive: GameArchive to read from.
+    :param index: Game index, counting from 0.
+    :param plies: Replay only this many plies (to reach a position in the middle of the game); all by default.
+    :param backend: ChessVar backend to replay with.
+    :param verify: If True, each move is checked with ChessVar.check_move first, and a ValueError is raised
+    for an illegal one.  Archives written from checked games don't need this.  Without it, only the cheap
+    checks are made: a ValueError is still raised for a move after the game ended, or one that doesn't start
+    from a piece of the player to move.
+    :return: ChessVar object in the position reached.
+    """
+    moves = archive.get_game(index).moves
+    if plies is not None:
+        moves = moves[:plies]
+    game = ChessVar(backend=backend, headless=True)
+    for ply, move in enumerate(moves):
+        if verify:
+            reason = game.check_move(SQUARE_NAMES[move & 63], SQUARE_NAMES[move >> 6 & 63])
+        elif game.get_game_state() != 'UNFINISHED':
+            reason = "game already over"
+        else:
+            piece_code = game.get_piece_code_at(move & 63)
+            reason = MOVE_OK
+            if piece_code is None or COLOR_NAMES[piece_code // 6] != game.get_player_turn():
+                reason = "no {} piece on the starting square".format(game.get_player_turn())
+        if reason != MOVE_OK:
+            raise ValueError("Illegal move {} at ply {} of game {}: {}".format(
+                ''.join(move_to_positions(move)), ply, index, reason))
+        game.push(move)
+    return game
+
+
+def convert_games(games, path):
+    """
+    Writes games read from text (see replay.parse_game) to an archive, checking every move.
+    :param games: Iterable of games, each a list of (current position, requested position) pairs.
+    Games containing an illegal move are skipped.
+    :param path: Archive file to write.
+    :return: Tuple of (games written, games skipped).
+    """
+    written = skipped = 0
+    with GameArchiveWriter(path) as writer:
+        for moves in games:
+            game = ChessVar(backend='bitboard', headless=True)
+            encoded_moves = []
+            for current_position, requested_position in moves:
+                if requested_position is None or game.check_move(current_position, requested_position) != MOVE_OK:
+                    break
+                move = encode_move(SQUARE_INDICES[current_position[0].lower() + current_position[1]],
+                                   SQUARE_INDICES[requested_position])
+                encoded_moves.append(move)
+                game.push(move)
+            else:
+                writer.add_game(encoded_moves, game.get_game_state())
+                written += 1
+                continue
+            skipped += 1
+    return written, skipped
+
+
+def main():
+    from replay import parse_game, read_games
+
+    parser = argparse.ArgumentParser(description="Convert, read and replay binary atomic chess game archives.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert_parser = subparsers.add_parser('convert', help="write a file of games (as read by replay.py) to an archive")
+    convert_parser.add_argument('games')
+    convert_parser.add_argument('archive')
+    show_parser = subparsers.add_parser('show', help="print a game's moves, or its position after some plies")
+    show_parser.add_argument('archive')
+    show_parser.add_argument('game', type=int, help="game index, counting from 0")
+    show_parser.add_argument('--ply', type=int, default=None, help="print the FEN position after this many plies")
+    replay_parser = subparsers.add_parser('replay', help="replay every game and check the stored results")
+    replay_parser.add_argument('archive')
+    replay_parser.add_argument('--verify', action='store_true', help="check every move's legality as well")
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        start = time.perf_counter()
+        with open(args.games) as games_file:
+            games = (parse_game(line) for _, line in read_games(games_file))
+            written, skipped = convert_games(games, args.archive)
+        print("{} games written, {} with illegal moves skipped in {:.1f}s".format(
+            written, skipped, time.perf_counter() - start))
+        return 0
+
+    with GameArchive(args.archive) as archive:
+        if args.command == 'show':
+            if args.ply is not None:
+                print(replay_archived_game(archive, args.game, args.ply).to_fen())
+            else:
+                game = archive.get_game(args.game)
+                print(' '.join(''.join(move_to_positions(move)) for move in game.moves) + '  ' + game.result)
+            return 0
+
+        start = time.perf_counter()
+        plies = mismatches = 0
+        for index in range(len(archive)):
+            try:
+                game = replay_archived_game(archive, index, verify=args.verify)
+            except ValueError as error:
+                mismatches += 1
+                print(error, file=sys.stderr)
+                continue
+            plies += archive.get_ply_count(index)
+            if game.get_game_state() != archive.get_result(index):
+                mismatches += 1
+                print("Game {}: stored result {}, replayed {}".format(
+                    index, archive.get_result(index), game.get_game_state()), file=sys.stderr)
+        seconds = time.perf_counter() - start
+        print("{} games, {} plies replayed in {:.2f}s ({:.0f} plies/s), {} illegal or with a different result".format(
+            len(archive), plies, seconds, plies / seconds if seconds > 0 else 0, mismatches))
+        return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
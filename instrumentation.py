@@ -0,0 +1,181 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Opt-in counters and timers for the phases of the atomic chess rules engine.
+
+import time
+
+import ChessVar as engine
+
+# Phases timed while instrumentation is enabled, each with the functions it covers (owner, attribute name).
+# Times are inclusive: board_mutation includes the explosion_zone lookups made while executing a capture.
+PHASES = {
+    'parse_square': [(engine.ChessVar, '_parse_square')],
+    'piece_moves': [(engine, 'piece_targets'), (engine.ChessPiece, 'get_chess_piece_moves'),
+                    (engine.Pawn, 'get_chess_piece_moves'), (engine.Knight, 'get_chess_piece_moves'),
+                    (engine.King, 'get_chess_piece_moves')],
+    'pawn_captures': [(engine.Pawn, 'get_chess_piece_captures')],
+    'explosion_zone': [(engine.ChessVar, '_explosion_victims')],
+    'double_king_check': [(engine.ChessVar, '_both_kings_explode')],
+    'board_mutation': [(engine.ChessVar, '_execute_move')],
+}
+
+# Calls and total nanoseconds per phase, and the event counters, all reset by reset().
+_phase_calls = {phase: 0 for phase in PHASES}
+_phase_nanoseconds = {phase: 0 for phase in PHASES}
+_counters = {'moves_checked': 0, 'moves_generated': 0, 'explosions': 0, 'pieces_destroyed': 0}
+_rejections = {}
+
+# Original functions replaced while enabled, as (owner, attribute name, original) triples.
+_originals = []
+
+
+def _timed(phase, function):
+    """
+    Wraps function so that each call is counted and timed under phase.
+    """
+    def timed_function(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _phase_nanoseconds[phase] += time.perf_counter_ns() - start
+            _phase_calls[phase] += 1
+
+    timed_function.__wrapped__ = function
+    timed_function.__doc__ = function.__doc__
+    return timed_function
+
+
+def _counting_check_move(check_move):
+    """
+    Wraps ChessVar.check_move (used by make_move and play_move) to count moves checked and rejection reasons.
+    """
+    def counted_check_move(self, current_position, requested_position):
+        reason = check_move(self, current_position, requested_position)
+        _counters['moves_checked'] += 1
+        if reason != engine.MOVE_OK:
+            _rejections[reason] = _rejections.get(reason, 0) + 1
+        return reason
+
+    counted_check_move.__wrapped__ = check_move
+    return counted_check_move
+
+
+def _counting_generate_legal_moves(generate_legal_moves):
+    """
+    Wraps ChessVar.generate_legal_moves to count the moves generated.  Move lists read back from a
+    transposition table were not generated, so only calls without a table count.
+    """
+    def counted_generate_legal_moves(self, table=None):
+        moves = generate_legal_moves(self, table)
+        if table is None:
+            _counters['moves_generated'] += len(moves)
+        return moves
+
+    counted_generate_legal_moves.__wrapped__ = generate_legal_moves
+    return counted_generate_legal_moves
+
+
+def _counting_execute_move(execute_move):
+    """
+    Wraps ChessVar._execute_move (used by make_move and push) to count explosions and the pieces they destroy.
+    """
+    def counted_execute_move(self, from_square, to_square):
+        execute_move(self, from_square, to_square)
+        captured_piece, exploded_pieces = self._undo_stack[-1][3:5]
+        if captured_piece is not None:
+            # The capturing piece and the captured piece are destroyed along with the exploded ones.
+            _counters['explosions'] += 1
+            _counters['pieces_destroyed'] += 2 + len(exploded_pieces)
+
+    counted_execute_move.__wrapped__ = execute_move
+    return counted_execute_move
+
+
+def _replace(owner, name, replacement):
+    """
+    Replaces owner.name, remembering the original for disable().  Methods inherited from a parent class
+    are set on the owner itself, and later removed again rather than restored.
+    """
+    original = owner.__dict__.get(name) if isinstance(owner, type) else getattr(owner, name)
+    _originals.append((owner, name, original))
+    setattr(owner, name, replacement(getattr(owner, name)))
+
+
+def enable():
+    """
+    Starts counting and timing.  The engine's functions are swapped for instrumented versions, so nothing
+    is counted or slowed down before this is called or after disable().
+    """
+    if _originals:
+        return
+
+    # The counting wrappers go on first, so the board_mutation timer wraps the counted _execute_move.
+    _replace(engine.ChessVar, 'check_move', _counting_check_move)
+    _replace(engine.ChessVar, 'generate_legal_moves', _counting_generate_legal_moves)
+    _replace(engine.ChessVar, '_execute_move', _counting_execute_move)
+    for phase, functions in PHASES.items():
+        for owner, name in functions:
+            _replace(owner, name, lambda function, phase=phase: _timed(phase, function))
+
+
+def disable():
+    """
+    Puts the original engine functions back.  The counts gathered so far are kept until reset().
+    """
+    while _originals:
+        owner, name, original = _originals.pop()
+        if original is None:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, original)
+
+
+def is_enabled():
+    """
+    Returns True if instrumentation is currently enabled.
+    """
+    return bool(_originals)
+
+
+def reset():
+    """
+    Sets every count and time back to zero.
+    """
+    for phase in PHASES:
+        _phase_calls[phase] = 0
+        _phase_nanoseconds[phase] = 0
+    for counter in _counters:
+        _counters[counter] = 0
+    _rejections.clear()
+
+
+def snapshot():
+    """
+    Returns the counts and times gathered since the last reset().
+    :return: Dictionary with 'phases' (per phase: calls, seconds and microseconds per call),
+    'counters' (moves checked, moves generated, explosions, pieces destroyed) and 'rejections'
+    (moves rejected per reason code).
+    """
+    phases = {}
+    for phase in PHASES:
+        calls, nanoseconds = _phase_calls[phase], _phase_nanoseconds[phase]
+        phases[phase] = {'calls': calls, 'seconds': nanoseconds / 1e9,
+                         'microseconds_per_call': nanoseconds / 1e3 / calls if calls else 0.0}
+    return {'phases': phases, 'counters': dict(_counters), 'rejections': dict(_rejections)}
+
+
+def format_snapshot(stats=None):
+    """
+    Formats a snapshot (by default, a new one) as a table for printing.
+    """
+    stats = snapshot() if stats is None else stats
+    lines = ["{:<28} {:>12} {:>10} {:>12}".format('phase', 'calls', 'seconds', 'us/call')]
+    for phase, phase_stats in stats['phases'].items():
+        lines.append("{:<28} {:>12} {:>10.4f} {:>12.2f}".format(
+            phase, phase_stats['calls'], phase_stats['seconds'], phase_stats['microseconds_per_call']))
+    for counter, count in stats['counters'].items():
+        lines.append("{:<28} {:>12}".format(counter, count))
+    for reason, count in sorted(stats['rejections'].items()):
+        lines.append("{:<28} {:>12}".format('rejected ' + reason, count))
+    return '\n'.join(lines)
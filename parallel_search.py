@@ -0,0 +1,195 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Searches one atomic chess position on several cores by splitting its root moves between processes.
+
+import argparse
+import multiprocessing
+import os
+import time
+
+from ChessVar import ChessVar, move_to_positions
+from search import INFINITY, MATE_THRESHOLD, SearchResult, Searcher, print_search_info
+
+# Extra seconds the coordinating process waits past the deadline for workers to notice it and report back.
+DEADLINE_GRACE = 1.0
+
+# Set in each worker process by _start_worker.
+_worker_searcher = None
+_worker_search_id = None
+_shared_alpha = None
+
+
+def _start_worker(shared_alpha, max_megabytes, tablebase_directory):
+    """
+    Sets up a worker process: its own Searcher (whose transposition table lasts from one iteration to the next)
+    and the best root score of the current iteration, shared by every worker.
+    """
+    global _worker_searcher, _shared_alpha
+    tablebase = None
+    if tablebase_directory is not None:
+        from tablebase import Tablebase
+        tablebase = Tablebase(tablebase_directory)
+    _worker_searcher = Searcher(max_megabytes=max_megabytes, tablebase=tablebase)
+    _shared_alpha = shared_alpha
+
+
+def _search_root_move(task):
+    """
+    Searches one root move in a worker process.
+    :param task: Tuple of (search id, FEN of the root position, encoded move, depth, deadline as a time.time() value
+    or None).
+    :return: Tuple of (move, score, whether the score is exact rather than an upper bound, principal variation,
+    positions visited), with a score of None if the deadline passed first.
+    """
+    global _worker_search_id
+    search_id, fen, move, depth, deadline = task
+    if search_id != _worker_search_id:
+        _worker_searcher.new_search()
+        _worker_search_id = search_id
+
+    # Moves only have to beat the best score any worker has found so far in this iteration.
+    alpha = _shared_alpha.value
+    time_limit = None
+    if deadline is not None:
+        time_limit = deadline - time.time()
+        if time_limit <= 0:
+            return move, None, False, (), 0
+
+    game = ChessVar.from_fen(fen, 'bitboard', headless=True)
+    searched = _worker_searcher.search_move(game, move, depth, alpha, time_limit)
+    if searched is None:
+        return move, None, False, (), 0
+
+    score, principal_variation, nodes = searched
+    exact = score > alpha
+    if exact:
+        with _shared_alpha.get_lock():
+            if score > _shared_alpha.value:
+                _shared_alpha.value = score
+    return move, score, exact, principal_variation, nodes
+
+
+class ParallelSearcher:
+    """
+    Iterative deepening search with root splitting: each iteration searches the previous iteration's best move
+    first, then hands the other root moves out to a pool of worker processes, which only need to show that a
+    move beats the best score found so far (shared between them).  Every worker stops at the same deadline,
+    and an iteration only counts once all of its root moves are searched.
+    """
+
+    def __init__(self, workers=None, max_megabytes=16, tablebase_directory=None):
+        """
+        :param workers: Number of worker processes; one per CPU core if None.
+        :param max_megabytes: Memory cap of each worker's transposition table.
+        :param tablebase_directory: Optional directory of endgame tablebases for the workers to probe.
+        """
+        self._workers = workers if workers is not None else os.cpu_count() or 1
+        self._shared_alpha = multiprocessing.Value('q', -INFINITY)
+        self._pool = multiprocessing.Pool(self._workers, _start_worker,
+                                          (self._shared_alpha, max_megabytes, tablebase_directory))
+        self._search_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Stops the worker processes.
+        """
+        self._pool.terminate()
+        self._pool.join()
+
+    def get_worker_count(self):
+        return self._workers
+
+    def search(self, game, time_limit=None, max_depth=64, info_hook=None):
+        """
+        Searches the position of game one ply deeper at a time until the time runs out.
+        :param game: ChessVar object to search; it isn't changed.
+        :param time_limit: Seconds the whole search may take, or None.
+        :param max_depth: Deepest iteration to run.
+        :param info_hook: Optional function called with a SearchResult after every completed iteration.
+        :return: SearchResult of the deepest completed iteration.
+        """
+        start = time.perf_counter()
+        deadline = time.time() + time_limit if time_limit is not None else None
+        self._search_count += 1
+        fen = game.to_fen()
+
+        moves = game.generate_legal_moves()
+        if not moves:
+            return SearchResult(None, 0, 0, 0, 0.0, ())
+
+        # If not even the first iteration finishes, fall back on the first move.
+        result = SearchResult(moves[0], 0, 0, 0, 0.0, (moves[0],))
+        nodes = 0
+
+        for depth in range(1, max_depth + 1):
+            with self._shared_alpha.get_lock():
+                self._shared_alpha.value = -INFINITY
+            tasks = [(self._search_count, fen, move, depth, deadline) for move in moves]
+
+            # After the first iteration, the best move so far is searched alone, so the others start with
+            # its score to beat.
+            searched = []
+            if depth > 1:
+                searched.append(self._pool.apply(_search_root_move, (tasks.pop(0),)))
+            if searched and searched[0][1] is None:
+                break
+            pending = self._pool.map_async(_search_root_move, tasks, chunksize=1)
+            try:
+                searched.extend(pending.get(None if deadline is None else deadline - time.time() + DEADLINE_GRACE))
+            except multiprocessing.TimeoutError:
+                break
+            nodes += sum(searched_move[4] for searched_move in searched)
+            if any(searched_move[1] is None for searched_move in searched):
+                break
+
+            # Exact scores win ties against upper bounds equal to them; otherwise the earlier move is kept.
+            order = {move: index for index, move in enumerate(moves)}
+            best = max(searched, key=lambda searched_move: (searched_move[1], searched_move[2],
+                                                            -order[searched_move[0]]))
+            seconds = time.perf_counter() - start
+            result = SearchResult(best[0], best[1], depth, nodes, seconds, best[3])
+            if info_hook is not None:
+                info_hook(result)
+
+            if abs(best[1]) > MATE_THRESHOLD:
+                break
+            # The next iteration takes several times longer, so don't start one that can't finish.
+            if time_limit is not None and seconds > time_limit / 2:
+                break
+
+            # The next iteration searches moves in order of their scores, best first.
+            searched.sort(key=lambda searched_move: (searched_move[1], searched_move[2]), reverse=True)
+            moves = [best[0]] + [searched_move[0] for searched_move in searched if searched_move[0] != best[0]]
+
+        return result._replace(nodes=nodes, seconds=time.perf_counter() - start)
+
+
+def main():
+    from perft import play_line
+
+    parser = argparse.ArgumentParser(description="Search an atomic chess position on several cores.")
+    parser.add_argument('--moves', default='', help="search the position after these moves (e.g. 'e2e4 e7e5')")
+    parser.add_argument('--fen', default=None, help="search this FEN position instead of the starting position")
+    parser.add_argument('--time', type=float, default=5.0, help="seconds to search for")
+    parser.add_argument('--depth', type=int, default=64, help="deepest iteration to run")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--tablebases', default=None, help="directory of endgame tablebases to probe")
+    args = parser.parse_args()
+
+    game = ChessVar.from_fen(args.fen, 'bitboard', headless=True) if args.fen else play_line(args.moves, 'bitboard')
+    with ParallelSearcher(args.workers, tablebase_directory=args.tablebases) as searcher:
+        result = searcher.search(game, args.time, args.depth, print_search_info)
+    if result.best_move is None:
+        print("No legal moves.")
+    else:
+        print("Best move: " + ''.join(move_to_positions(result.best_move)))
+
+
+if __name__ == '__main__':
+    main()
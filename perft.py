@@ -0,0 +1,143 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Perft node counts for atomic chess, used as a move generation benchmark and correctness check.
+
+import argparse
+import time
+
+from ChessVar import ChessVar, SQUARE_INDICES, move_from_square, move_to_square, move_to_positions
+
+# Positions with known node counts.  Each position is given as the moves (current and requested
+# positions, as accepted by make_move) played from the starting position built by ChessVar.__init__.
+PERFT_SUITE = [
+    ('Starting position', '',
+     {1: 20, 2: 400, 3: 9302, 4: 215971, 5: 5680062}),
+    ('After a Pawn exchange', 'e2e4 d7d5 e4d5',
+     {1: 31, 2: 861, 3: 29095, 4: 868396}),
+    ('After a Knight explosion on c7', 'b1c3 e7e6 c3b5 a7a6 b5c7',
+     {1: 29, 2: 549, 3: 15955, 4: 350178}),
+    ('Kings next to each other', 'e2e4 d7d5 e1e2 e8d7 e2d3 d7d6 d3d4 d6e5',
+     {1: 33, 2: 1032, 3: 35027, 4: 1116487}),
+    ('Black King destroyed by an explosion on f7', 'g1f3 a7a6 f3g5 a6a5 g5f7',
+     {1: 0, 2: 0, 3: 0}),
+]
+
+
+def play_line(line, backend='bitboard'):
+    """
+    Builds a game by playing a line of moves from the starting position.
+    :param line: Moves as 'e2e4 e7e5 ...' (current position followed by requested position).
+    :param backend: ChessVar backend to use.
+    :return: ChessVar object after the moves have been made.
+    """
+    game = ChessVar(backend=backend)
+    for move_text in line.split():
+        from_square, to_square = SQUARE_INDICES[move_text[:2]], SQUARE_INDICES[move_text[2:]]
+        for move in game.generate_legal_moves():
+            if move_from_square(move) == from_square and move_to_square(move) == to_square:
+                game.push(move)
+                break
+        else:
+            raise ValueError("Illegal move in line: " + move_text)
+    return game
+
+
+def perft(game, depth):
+    """
+    Counts the positions reached after exactly depth moves from the current position of game.
+    Games which have been won along the way end there and add nothing to the count.
+    :param game: ChessVar object, left unchanged once the count is done.
+    :param depth: Number of moves to look ahead.
+    :return: Number of leaf positions.
+    """
+    if depth == 0:
+        return 1
+
+    moves = game.generate_legal_moves()
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        game.push(move)
+        nodes += perft(game, depth - 1)
+        game.pop()
+    return nodes
+
+
+def divide(game, depth):
+    """
+    Splits a perft count by the first move played.
+    :return: List of (move as 'e2e4', node count) pairs, in the order the moves were generated.
+    """
+    counts = []
+    for move in game.generate_legal_moves():
+        game.push(move)
+        counts.append((''.join(move_to_positions(move)), perft(game, depth - 1)))
+        game.pop()
+    return counts
+
+
+def timed_perft(game, depth):
+    """
+    Runs perft and times it.
+    :return: Tuple of (nodes, seconds, nodes per second).
+    """
+    start = time.perf_counter()
+    nodes = perft(game, depth)
+    seconds = time.perf_counter() - start
+    return nodes, seconds, nodes / seconds if seconds > 0 else 0.0
+
+
+def run_suite(max_depth=3, backend='bitboard'):
+    """
+    Runs every position of PERFT_SUITE up to max_depth, printing node counts, timings and whether
+    each count matches the known value.
+    :return: True if every count matched.
+    """
+    all_passed = True
+    total_nodes, total_seconds = 0, 0.0
+
+    for name, line, expected_counts in PERFT_SUITE:
+        game = play_line(line, backend)
+        for depth in sorted(expected_counts):
+            if depth > max_depth:
+                break
+            nodes, seconds, nodes_per_second = timed_perft(game, depth)
+            passed = nodes == expected_counts[depth]
+            all_passed = all_passed and passed
+            total_nodes += nodes
+            total_seconds += seconds
+            print("{:<45} depth {} {:>10} nodes {:>8.3f}s {:>10.0f} nodes/s  {}".format(
+                name, depth, nodes, seconds, nodes_per_second,
+                'ok' if passed else 'FAILED (expected ' + str(expected_counts[depth]) + ')'))
+
+    if total_seconds > 0:
+        print("Total: {} nodes in {:.3f}s ({:.0f} nodes/s)".format(
+            total_nodes, total_seconds, total_nodes / total_seconds))
+    return all_passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft node counts for atomic chess.")
+    parser.add_argument('--depth', type=int, default=3, help="number of moves to look ahead")
+    parser.add_argument('--backend', choices=['bitboard', 'list'], default='bitboard')
+    parser.add_argument('--moves', default=None,
+                        help="count from the position after these moves (e.g. 'e2e4 e7e5') instead of the suite")
+    parser.add_argument('--divide', action='store_true', help="also print the count for each first move")
+    args = parser.parse_args()
+
+    if args.moves is None:
+        return 0 if run_suite(args.depth, args.backend) else 1
+
+    game = play_line(args.moves, args.backend)
+    if args.divide:
+        for move_text, nodes in divide(game, args.depth):
+            print(move_text + ': ' + str(nodes))
+    nodes, seconds, nodes_per_second = timed_perft(game, args.depth)
+    print("Nodes: {}  Time: {:.3f}s  Nodes/s: {:.0f}".format(nodes, seconds, nodes_per_second))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
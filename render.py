@@ -0,0 +1,152 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Terminal rendering of the atomic chess board.  termcolor is only imported here.
+
+import sys
+
+from termcolor import colored
+
+from ChessVar import PIECE_NAMES
+
+COLUMN_LETTERS = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']
+BORDER_LETTERS = '  ' + ' '.join(COLUMN_LETTERS) + ' \n'
+
+# Index of the empty square's text in the lists returned by build_cells.
+EMPTY_CELL = 12
+
+# Lines of a frame above the 8th row of the board (a blank line and the border letters).
+FRAME_TOP_LINES = 2
+
+
+def build_cells(force_color=None):
+    """
+    Colors the text of every kind of square once, so frames can be put together without calling termcolor.
+    :param force_color: Passed on to termcolor; True colors the text even when not writing to a terminal.
+    :return: List of 13 strings: one per piece code (color * 6 + piece type), then the empty square.
+    """
+    cells = []
+    for piece_code in range(12):
+        name = PIECE_NAMES[piece_code % 6]
+        if piece_code >= 6:
+            cells.append(colored(name, "black", "on_light_yellow", attrs=["bold"], force_color=force_color))
+        else:
+            cells.append(colored(name, "white", "on_light_blue", attrs=["bold"], force_color=force_color))
+    cells.append(colored('.', "white", force_color=force_color))
+    return cells
+
+
+def board_codes(game):
+    """
+    Returns the piece code on each of the 64 squares of a ChessVar object (EMPTY_CELL for empty squares).
+    """
+    codes = []
+    for square in range(64):
+        piece_code = game.get_piece_code_at(square)
+        codes.append(EMPTY_CELL if piece_code is None else piece_code)
+    return codes
+
+
+def render_frame(game, cells=None):
+    """
+    Builds the whole board of a ChessVar object, borders included, as one string.
+    :param cells: Square texts from build_cells; built for the current output by default.
+    """
+    if cells is None:
+        cells = build_cells()
+    codes = board_codes(game)
+
+    parts = ['\n', BORDER_LETTERS]
+    for row in range(7, -1, -1):
+        row_number = str(row + 1)
+        parts.append(row_number + ' ')
+        for square in range(row * 8, row * 8 + 8):
+            parts.append(cells[codes[square]] + ' ')
+        parts.append(row_number + '\n')
+    parts.append(BORDER_LETTERS)
+    parts.append('\n')
+    return ''.join(parts)
+
+
+def print_board(game):
+    """
+    Prints the current state of the atomic chess board of a ChessVar object, in color, with a single write.
+    :param game: ChessVar object whose board should be printed.
+    """
+    sys.stdout.write(render_frame(game))
+    sys.stdout.flush()
+
+
+class BoardRenderer:
+    """
+    Draws a live board on an ANSI terminal at a fixed place on the screen.  The first frame is drawn in full;
+    after that only squares whose contents changed are repainted (a moved piece's old and new squares,
+    and every square an explosion cleared), each with a cursor positioning sequence, in one write per frame.
+    """
+
+    def __init__(self, stream=None, origin_row=1, origin_column=1, force_color=True):
+        """
+        :param stream: File-like object to write to; sys.stdout by default.
+        :param origin_row: Screen row (counting from 1) of the top line of the frame.
+        :param origin_column: Screen column (counting from 1) of the left edge of the frame.
+        :param force_color: Passed on to termcolor (see build_cells).
+        """
+        self._stream = stream
+        self._origin_row = origin_row
+        self._origin_column = origin_column
+        self._cells = build_cells(force_color)
+        self._codes = None
+
+    def reset(self):
+        """
+        Forgets what is on the screen, so the next frame is drawn in full (e.g. after the screen was cleared).
+        """
+        self._codes = None
+
+    def _cursor_to(self, row, column):
+        return '\x1b[{};{}H'.format(self._origin_row + row, self._origin_column + column)
+
+    def _square_position(self, square):
+        """
+        Returns the cursor positioning sequence for the text of a square inside the frame.
+        """
+        return self._cursor_to(FRAME_TOP_LINES + 7 - square // 8, 2 + 2 * (square % 8))
+
+    def render(self, game):
+        """
+        Builds the text that brings the screen up to date with the board of a ChessVar object, without writing it.
+        :return: Tuple of (text, number of squares painted).
+        """
+        codes = board_codes(game)
+        cells = self._cells
+
+        if self._codes is None:
+            lines = render_frame(game, cells).split('\n')
+            parts = [self._cursor_to(line_index, 0) + line for line_index, line in enumerate(lines)]
+            painted = 64
+        else:
+            parts = []
+            previous_codes = self._codes
+            for square in range(64):
+                if codes[square] != previous_codes[square]:
+                    parts.append(self._square_position(square) + cells[codes[square]])
+            painted = len(parts)
+
+        self._codes = codes
+        if not painted:
+            return '', 0
+
+        # Leaves the cursor below the frame, ready for any text that follows.
+        parts.append(self._cursor_to(FRAME_TOP_LINES + 10, 0))
+        return ''.join(parts), painted
+
+    def draw(self, game):
+        """
+        Writes the changes since the last frame (the whole board the first time) in one write.
+        :return: Number of squares painted.
+        """
+        text, painted = self.render(game)
+        if text:
+            stream = self._stream if self._stream is not None else sys.stdout
+            stream.write(text)
+            stream.flush()
+        return painted
@@ -0,0 +1,195 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Streams archived atomic chess games from a file, replays them and reports whether each one is legal.
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import sys
+import time
+from collections import namedtuple
+
+from ChessVar import ChessVar, MOVE_OK, SQUARE_INDICES, encode_move
+
+# Reason code for a move which isn't a pair of squares at all (e.g. a lone square at the end of a line).
+MALFORMED_MOVE = 'MALFORMED_MOVE'
+
+# Number of games handed to a worker process at a time.  Only a few batches are read ahead of the
+# verdicts being used, so memory stays flat however large the file is.
+DEFAULT_BATCH_SIZE = 500
+
+
+class GameVerdict(namedtuple('GameVerdict', ['line_number', 'legal', 'plies', 'illegal_ply', 'illegal_move',
+                                             'reason', 'game_state'])):
+    """
+    Result of replaying one archived game.
+    line_number: Line of the file the game was read from, counting from 1.
+    legal: True if every move of the game was legal.
+    plies: Number of moves replayed before the game ended or an illegal move was found.
+    illegal_ply: Number of the first illegal move (white's first move is 1), or None.
+    illegal_move: The first illegal move as (current position, requested position), or None.
+    reason: MOVE_OK, or the reason code the first illegal move was rejected for (see ChessVar.check_move).
+    game_state: Game state after the last legal move.
+    """
+    __slots__ = ()
+
+
+def parse_game(line):
+    """
+    Reads the moves of one archived game.
+    :param line: Moves as from/to square pairs, written 'e2 e4 e7 e5' or 'e2e4 e7e5', or a JSON game
+    record written by selfplay.py.
+    :return: List of (current position, requested position) pairs.  A token which isn't a move is
+    kept as (token, None).
+    """
+    if line.startswith('{'):
+        tokens = json.loads(line)['moves']
+    else:
+        tokens = line.split()
+
+    moves = []
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if len(token) == 4:
+            moves.append((token[:2], token[2:]))
+            index += 1
+        elif len(token) == 2 and index + 1 < len(tokens) and len(tokens[index + 1]) == 2:
+            moves.append((token, tokens[index + 1]))
+            index += 2
+        else:
+            moves.append((token, None))
+            index += 1
+    return moves
+
+
+def replay_game(moves, backend='bitboard'):
+    """
+    Replays moves from the starting position, stopping at the first illegal one.  Nothing is printed.
+    :param moves: List of (current position, requested position) pairs, as make_move takes them.
+    :param backend: ChessVar backend to replay with.
+    :return: Tuple of (plies replayed, first illegal move or None, reason code, final game state).
+    """
+    game = ChessVar(backend=backend, headless=True)
+    for ply, (current_position, requested_position) in enumerate(moves):
+        if requested_position is None:
+            return ply, (current_position, requested_position), MALFORMED_MOVE, game.get_game_state()
+
+        reason = game.check_move(current_position, requested_position)
+        if reason != MOVE_OK:
+            return ply, (current_position, requested_position), reason, game.get_game_state()
+
+        # The move has been checked, so it is made directly rather than through make_move.
+        game.push(encode_move(SQUARE_INDICES[current_position[0].lower() + current_position[1]],
+                              SQUARE_INDICES[requested_position]))
+
+    return len(moves), None, MOVE_OK, game.get_game_state()
+
+
+def validate_line(line_number, line, backend='bitboard'):
+    """
+    Parses and replays the game on one line of an archive.
+    :return: GameVerdict of the game.
+    """
+    try:
+        moves = parse_game(line)
+    except (ValueError, KeyError, TypeError):
+        return GameVerdict(line_number, False, 0, 1, None, MALFORMED_MOVE, 'UNFINISHED')
+
+    plies, illegal_move, reason, game_state = replay_game(moves, backend)
+    if illegal_move is None:
+        return GameVerdict(line_number, True, plies, None, None, MOVE_OK, game_state)
+    return GameVerdict(line_number, False, plies, plies + 1, illegal_move, reason, game_state)
+
+
+def _validate_batch(task):
+    """
+    Validates a batch of games in a worker process.
+    :param task: Tuple of (backend, list of (line number, line) pairs).
+    :return: List of GameVerdicts, in the order of the batch.
+    """
+    backend, batch = task
+    return [validate_line(line_number, line, backend) for line_number, line in batch]
+
+
+def read_games(lines):
+    """
+    Reads archived games one at a time, skipping blank lines and lines starting with '#'.
+    :param lines: Iterable of lines, such as an open file.
+    :return: Generator of (line number, line) pairs.
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and line[0] != '#':
+            yield line_number, line
+
+
+def validate_games(lines, backend='bitboard', workers=1, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Replays every game of an archive, yielding a GameVerdict per game in file order.  Lines are read
+    lazily, so the archive is never held in memory.
+    :param lines: Iterable of lines, one game per line (see parse_game).
+    :param backend: ChessVar backend to replay with.
+    :param workers: Number of worker processes; 1 replays in this process, None uses one per CPU core.
+    :param batch_size: Number of games handed to a worker at a time.
+    """
+    games = read_games(lines)
+    if workers == 1:
+        for line_number, line in games:
+            yield validate_line(line_number, line, backend)
+        return
+
+    # Pool.imap would read the whole input ahead of the workers, so batches are handed out a
+    # chunk at a time instead: enough to keep every worker busy, and no more.
+    with multiprocessing.Pool(workers) as pool:
+        tasks_per_chunk = 2 * (workers or multiprocessing.cpu_count())
+        while True:
+            tasks = []
+            for _ in range(tasks_per_chunk):
+                batch = list(itertools.islice(games, batch_size))
+                if not batch:
+                    break
+                tasks.append((backend, batch))
+            if not tasks:
+                return
+            for verdicts in pool.imap(_validate_batch, tasks):
+                for verdict in verdicts:
+                    yield verdict
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay archived atomic chess games and check they are legal.")
+    parser.add_argument('archive', help="file with one game per line ('e2e4 e7e5 ...'), or - for standard input")
+    parser.add_argument('--backend', choices=['bitboard', 'list'], default='bitboard')
+    parser.add_argument('--workers', type=int, default=1, help="worker processes (0 for one per core)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--all', action='store_true', help="print a verdict for every game, not just illegal ones")
+    args = parser.parse_args()
+
+    archive = sys.stdin if args.archive == '-' else open(args.archive)
+    counts = {'games': 0, 'illegal': 0, 'WHITE_WON': 0, 'BLACK_WON': 0, 'UNFINISHED': 0}
+    start = time.perf_counter()
+    try:
+        for verdict in validate_games(archive, args.backend, args.workers or None, args.batch_size):
+            counts['games'] += 1
+            if not verdict.legal:
+                counts['illegal'] += 1
+            else:
+                counts[verdict.game_state] += 1
+            if args.all or not verdict.legal:
+                print(json.dumps(verdict._asdict()))
+    finally:
+        if archive is not sys.stdin:
+            archive.close()
+
+    seconds = time.perf_counter() - start
+    print("{games} games: {illegal} illegal, white won {WHITE_WON}, black won {BLACK_WON}, "
+          "unfinished {UNFINISHED}".format(**counts), file=sys.stderr)
+    print("{:.3f}s ({:.0f} games/s)".format(seconds, counts['games'] / seconds if seconds > 0 else 0),
+          file=sys.stderr)
+    return 1 if counts['illegal'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
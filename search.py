@@ -0,0 +1,445 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Alpha-beta search engine for atomic chess, built on ChessVar.generate_legal_moves and push/pop.
+
+import argparse
+import time
+from collections import namedtuple
+
+from ChessVar import ChessVar, MOVE_CAPTURE, MOVE_OK, PIECE_VALUES, move_to_positions
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+# Kings are worth MATE_SCORE (see ChessVar.PIECE_VALUES for the other pieces).
+MATE_SCORE = 100000
+MATE_THRESHOLD = MATE_SCORE - 1000
+INFINITY = 1000000
+
+# How many nodes are searched between checks of the time and node budgets.
+BUDGET_CHECK_INTERVAL = 256
+
+
+class SearchResult(namedtuple('SearchResult', ['best_move', 'score', 'depth', 'nodes', 'seconds',
+                                               'principal_variation'])):
+    """
+    Outcome of Searcher.search.
+    best_move: Encoded best move (see ChessVar.encode_move), or None if there are no legal moves.
+    score: Score in centipawns for the player to move; beyond +/-MATE_THRESHOLD a King explodes by force.
+    depth: Depth (in plies) of the last fully completed iteration.
+    nodes: Positions visited.
+    seconds: Time spent searching.
+    principal_variation: Tuple of encoded moves the search expects to be played, best_move first.
+    """
+    __slots__ = ()
+
+
+class SearchStopped(Exception):
+    """
+    Raised inside the search when the time or node budget runs out.
+    """
+
+
+def evaluate(game):
+    """
+    Scores a position by material, from the point of view of the player whose turn it is.
+    """
+    counts = game.get_piece_counts()
+    score = 0
+    for piece_type in range(5):
+        score += (counts[piece_type] - counts[6 + piece_type]) * PIECE_VALUES[piece_type]
+    return score if game.get_player_turn() == 'white' else -score
+
+
+def capture_gain(outcome):
+    """
+    Returns the material a capture wins (or loses) for the player making it, counting a King as MATE_SCORE.
+    :param outcome: CaptureOutcome from ChessVar.get_capture_outcomes.
+    """
+    return (outcome.material_swing + (MATE_SCORE if outcome.enemy_king_destroyed else 0) -
+            (MATE_SCORE if outcome.own_king_destroyed else 0))
+
+
+def score_to_table(score, ply):
+    """
+    Converts a score into one relative to the position being stored, so mate distances stay correct
+    when the same position is found at another ply.
+    """
+    if score > MATE_THRESHOLD:
+        return score + ply
+    if score < -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """
+    Reverses score_to_table for a position found at ply.
+    """
+    if score > MATE_THRESHOLD:
+        return score - ply
+    if score < -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+class Searcher:
+    """
+    Negamax search with alpha-beta pruning, iterative deepening, a transposition table and a capture-only
+    quiescence search.  Captures are tried first, ordered by the material their explosion wins.
+    """
+
+    def __init__(self, table=None, max_megabytes=16, tablebase=None):
+        """
+        :param table: TranspositionTable to share between searches; a new one is made if not given.
+        :param max_megabytes: Memory cap of the new table.
+        :param tablebase: Optional tablebase.Tablebase; positions it covers are scored exactly instead of searched.
+        """
+        self._table = table if table is not None else TranspositionTable(max_megabytes)
+        self._tablebase = tablebase
+        self._killers = []
+        self._nodes = 0
+        self._next_budget_check = 0
+        self._deadline = None
+        self._node_limit = None
+
+    def search(self, game, time_limit=None, node_limit=None, max_depth=64, info_hook=None):
+        """
+        Searches the position of game one ply deeper at a time until a budget runs out.  The game is
+        left as it was found.
+        :param game: ChessVar object to search.
+        :param time_limit: Seconds the search may take, or None.
+        :param node_limit: Positions the search may visit, or None.
+        :param max_depth: Deepest iteration to run.
+        :param info_hook: Optional function called with a SearchResult after every completed iteration.
+        :return: SearchResult of the deepest completed iteration.
+        """
+        start = time.perf_counter()
+        self._deadline = start + time_limit if time_limit is not None else None
+        self._node_limit = node_limit
+        self._nodes = 0
+        self._next_budget_check = BUDGET_CHECK_INTERVAL
+        self._killers = [[None, None] for _ in range(max_depth + 1)]
+        self._table.new_search()
+
+        moves = self._order_moves(game, game.generate_legal_moves(), None, 0)
+        if not moves:
+            return SearchResult(None, 0, 0, 0, 0.0, ())
+
+        # If not even the first iteration finishes, fall back on the best-looking move.
+        result = SearchResult(moves[0], 0, 0, 0, 0.0, (moves[0],))
+
+        for depth in range(1, max_depth + 1):
+            try:
+                best_move, score = self._search_root(game, moves, depth)
+            except SearchStopped:
+                break
+
+            # The best move so far is searched first in the next iteration.
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            seconds = time.perf_counter() - start
+            result = SearchResult(best_move, score, depth, self._nodes, seconds,
+                                  self._principal_variation(game, depth))
+            if info_hook is not None:
+                info_hook(result)
+
+            if abs(score) > MATE_THRESHOLD:
+                break
+
+            # The next iteration takes several times longer, so don't start one that can't finish.
+            if time_limit is not None and seconds > time_limit / 2:
+                break
+
+        return result._replace(nodes=self._nodes, seconds=time.perf_counter() - start)
+
+    def new_search(self):
+        """
+        Starts a new search for search_move: killer moves are forgotten and the transposition table's
+        entries become the first to be replaced.
+        """
+        self._killers = []
+        self._table.new_search()
+
+    def search_move(self, game, move, depth, alpha=-INFINITY, time_limit=None):
+        """
+        Searches a single root move to depth, as when the root moves of a search are split between processes.
+        The transposition table and killer moves carry over from earlier calls until new_search is called.
+        :param game: ChessVar object in the root position; it is left as it was found.
+        :param move: Encoded root move to search.
+        :param depth: Depth of the search, counting the root move.
+        :param alpha: Score the move has to beat; a move which can't beat it gets a score of at most alpha.
+        :param time_limit: Seconds the search may take, or None.
+        :return: Tuple of (score for the player to move in game, principal variation, positions visited),
+        or None if the time ran out first.
+        """
+        self._deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self._node_limit = None
+        self._nodes = 0
+        self._next_budget_check = BUDGET_CHECK_INTERVAL
+        while len(self._killers) <= depth:
+            self._killers.append([None, None])
+
+        game.push(move)
+        try:
+            score = -self._negamax(game, depth - 1, -INFINITY, -alpha, 1)
+            principal_variation = (move,) + self._principal_variation(game, depth - 1)
+        except SearchStopped:
+            return None
+        finally:
+            game.pop()
+        return score, principal_variation, self._nodes
+
+    def _check_budget(self):
+        """
+        Raises SearchStopped once the time or node budget is used up.
+        """
+        self._next_budget_check = self._nodes + BUDGET_CHECK_INTERVAL
+        if self._node_limit is not None and self._nodes >= self._node_limit:
+            raise SearchStopped()
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchStopped()
+
+    def _search_root(self, game, moves, depth):
+        """
+        Searches every root move to depth.
+        :return: Tuple of (best move, score).
+        """
+        alpha = -INFINITY
+        best_move = moves[0]
+        for move in moves:
+            game.push(move)
+            try:
+                score = -self._negamax(game, depth - 1, -INFINITY, -alpha, 1)
+            finally:
+                game.pop()
+            if score > alpha:
+                alpha = score
+                best_move = move
+
+        self._table.store(game.get_zobrist_key(), depth, score_to_table(alpha, 0), EXACT, best_move)
+        return best_move, alpha
+
+    def _negamax(self, game, depth, alpha, beta, ply):
+        """
+        Returns the score of the position for the player to move, searched depth plies deep.
+        """
+        self._nodes += 1
+        if self._nodes >= self._next_budget_check:
+            self._check_budget()
+
+        game_state = game.get_game_state()
+        if game_state != 'UNFINISHED':
+            return self._game_over_score(game, game_state, ply)
+
+        # Below the root, endgames in the tablebase need no search.  The root is still searched for a move.
+        if self._tablebase is not None and ply > 0:
+            score = self._tablebase_score(game, ply)
+            if score is not None:
+                return score
+
+        if depth <= 0:
+            return self._quiescence(game, alpha, beta, ply)
+
+        key = game.get_zobrist_key()
+        table_move = None
+        entry = self._table.probe(key)
+        if entry is not None:
+            entry_depth, entry_score, bound, table_move = entry
+            if entry_depth >= depth:
+                score = score_from_table(entry_score, ply)
+                if (bound == EXACT or (bound == LOWER_BOUND and score >= beta) or
+                        (bound == UPPER_BOUND and score <= alpha)):
+                    return score
+
+        moves = game.generate_legal_moves(self._table)
+        if not moves:
+            # Nothing can move, so the game cannot be won from here.
+            return 0
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = None
+        for move in self._order_moves(game, moves, table_move, ply):
+            game.push(move)
+            try:
+                score = -self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.pop()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                # Remember quiet moves which cause a cutoff, to try them early in sibling positions.
+                if not move & MOVE_CAPTURE and move != self._killers[ply][0]:
+                    self._killers[ply][1] = self._killers[ply][0]
+                    self._killers[ply][0] = move
+                break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self._table.store(key, depth, score_to_table(best_score, ply), bound, best_move)
+        return best_score
+
+    def _quiescence(self, game, alpha, beta, ply):
+        """
+        Searches only captures which do not lose material, so positions are never scored
+        in the middle of an exchange of explosions.
+        """
+        self._nodes += 1
+        if self._nodes >= self._next_budget_check:
+            self._check_budget()
+
+        game_state = game.get_game_state()
+        if game_state != 'UNFINISHED':
+            return self._game_over_score(game, game_state, ply)
+
+        key = game.get_zobrist_key()
+        stand_pat = self._table.probe_evaluation(key)
+        if stand_pat is None:
+            stand_pat = evaluate(game)
+            self._table.store_evaluation(key, stand_pat)
+
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        captures = []
+        for outcome in game.get_capture_outcomes():
+            if outcome.reason == MOVE_OK:
+                gain = capture_gain(outcome)
+                if gain >= 0:
+                    captures.append((gain, outcome.move))
+        captures.sort(reverse=True)
+
+        for _, move in captures:
+            game.push(move)
+            try:
+                score = -self._quiescence(game, -beta, -alpha, ply + 1)
+            finally:
+                game.pop()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    @staticmethod
+    def _game_over_score(game, game_state, ply):
+        """
+        Scores a won game for the player to move, preferring quicker wins and slower losses.
+        """
+        winner = 'white' if game_state == 'WHITE_WON' else 'black'
+        if winner == game.get_player_turn():
+            return MATE_SCORE - ply
+        return -(MATE_SCORE - ply)
+
+    def _tablebase_score(self, game, ply):
+        """
+        Scores a position found in the tablebase like a won game, with the King exploding after the
+        tablebase's number of plies.
+        :return: Score for the player to move, or None if the tablebase doesn't cover the position.
+        """
+        result = self._tablebase.probe(game)
+        if result is None:
+            return None
+        if result.result == 'WIN':
+            return MATE_SCORE - (ply + result.plies)
+        if result.result == 'LOSS':
+            return -(MATE_SCORE - (ply + result.plies))
+        return 0
+
+    def _order_moves(self, game, moves, table_move, ply):
+        """
+        Sorts moves for searching: the transposition table move, captures which win material (most first),
+        killer moves, other quiet moves, and finally captures which lose material.
+        """
+        killers = self._killers[ply] if ply < len(self._killers) else (None, None)
+        gains = None
+        scored_moves = []
+        for move in moves:
+            if move == table_move:
+                order = 3 * INFINITY
+            elif move & MOVE_CAPTURE:
+                if gains is None:
+                    gains = {outcome.move: capture_gain(outcome) for outcome in game.get_capture_outcomes()}
+                gain = gains[move]
+                order = 2 * INFINITY + gain if gain >= 0 else gain
+            elif move == killers[0]:
+                order = INFINITY + 2
+            elif move == killers[1]:
+                order = INFINITY + 1
+            else:
+                order = 0
+            scored_moves.append((order, move))
+        scored_moves.sort(key=lambda scored_move: scored_move[0], reverse=True)
+        return [move for _, move in scored_moves]
+
+    def _principal_variation(self, game, depth):
+        """
+        Follows best moves stored in the transposition table from the current position.
+        :return: Tuple of encoded moves, at most depth long.
+        """
+        principal_variation = []
+        try:
+            while len(principal_variation) < depth:
+                entry = self._table.probe(game.get_zobrist_key())
+                if entry is None or entry[3] not in game.generate_legal_moves():
+                    break
+                principal_variation.append(entry[3])
+                game.push(entry[3])
+        finally:
+            for _ in principal_variation:
+                game.pop()
+        return tuple(principal_variation)
+
+
+def find_best_move(game, time_limit=1.0, node_limit=None, max_depth=64, tablebase=None):
+    """
+    Searches the position of game with a new Searcher and returns the best move found (or None).
+    """
+    return Searcher(tablebase=tablebase).search(game, time_limit, node_limit, max_depth).best_move
+
+
+def print_search_info(result):
+    """
+    Prints one line describing a completed search iteration.
+    """
+    principal_variation = ' '.join(''.join(move_to_positions(move)) for move in result.principal_variation)
+    nodes_per_second = result.nodes / result.seconds if result.seconds > 0 else 0
+    print("depth {:>2}  score {:>7}  nodes {:>9}  time {:>7.3f}s  nps {:>7.0f}  pv {}".format(
+        result.depth, result.score, result.nodes, result.seconds, nodes_per_second, principal_variation))
+
+
+def main():
+    from perft import play_line
+
+    parser = argparse.ArgumentParser(description="Search an atomic chess position for the best move.")
+    parser.add_argument('--moves', default='', help="search the position after these moves (e.g. 'e2e4 e7e5')")
+    parser.add_argument('--time', type=float, default=5.0, help="seconds to search for")
+    parser.add_argument('--nodes', type=int, default=None, help="positions to search at most")
+    parser.add_argument('--depth', type=int, default=64, help="deepest iteration to run")
+    parser.add_argument('--fen', default=None, help="search this FEN position instead of the starting position")
+    parser.add_argument('--tablebases', default=None, help="directory of endgame tablebases to probe")
+    args = parser.parse_args()
+
+    game = ChessVar.from_fen(args.fen, 'bitboard', headless=True) if args.fen else play_line(args.moves, 'bitboard')
+    tablebase = None
+    if args.tablebases is not None:
+        from tablebase import Tablebase
+        tablebase = Tablebase(args.tablebases)
+    result = Searcher(tablebase=tablebase).search(game, args.time, args.nodes, args.depth, print_search_info)
+    if result.best_move is None:
+        print("No legal moves.")
+    else:
+        print("Best move: " + ''.join(move_to_positions(result.best_move)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Plays batches of atomic chess games between move policies across a pool of worker processes.
+
+import argparse
+import json
+import multiprocessing
+import random
+import time
+from collections import namedtuple
+
+from ChessVar import ChessVar, move_to_positions
+
+# Games still unfinished after this many plies are stopped without a winner.
+DEFAULT_MAX_PLIES = 300
+
+
+class GameRecord(namedtuple('GameRecord', ['game_index', 'seed', 'white', 'black', 'winner', 'game_state',
+                                           'move_count', 'moves', 'final_position'])):
+    """
+    Outcome of one self-play game.
+    winner: 'white', 'black', or None if the game was stopped or nobody could move.
+    moves: Moves played, each as 'e2e4'.
+    final_position: FEN string of the final position (see ChessVar.to_fen).
+    """
+    __slots__ = ()
+
+
+def make_policy(spec, rng):
+    """
+    Builds a move policy: a function taking a ChessVar object and returning the encoded move to play.
+    :param spec: 'random', 'search:<depth>', 'search-nodes:<nodes>' or 'search-time:<seconds>'.
+    Only the time-limited search can choose differently when a game is replayed with the same seed.
+    :param rng: random.Random object the policy draws from.
+    """
+    if spec == 'random':
+        return lambda game: rng.choice(game.generate_legal_moves())
+
+    from search import Searcher
+
+    kind, _, amount = spec.partition(':')
+    searcher = Searcher(max_megabytes=8)
+    if kind == 'search':
+        return lambda game: searcher.search(game, max_depth=int(amount)).best_move
+    if kind == 'search-nodes':
+        return lambda game: searcher.search(game, node_limit=int(amount)).best_move
+    if kind == 'search-time':
+        return lambda game: searcher.search(game, time_limit=float(amount)).best_move
+    raise ValueError("Unknown move policy: " + spec)
+
+
+def play_out(game, policies, max_plies):
+    """
+    Lets two policies play a game until it is won, the player to move has no moves, or max_plies moves are made.
+    :param game: ChessVar object to play on; it is left in the final position.
+    :param policies: Dictionary of the policy (see make_policy) playing 'white' and 'black'.
+    :return: List of the moves played, each as 'e2e4'.
+    """
+    moves = []
+    while game.get_game_state() == 'UNFINISHED' and len(moves) < max_plies:
+        if not game.generate_legal_moves():
+            break
+        move = policies[game.get_player_turn()](game)
+        moves.append(''.join(move_to_positions(move)))
+        game.push(move)
+    return moves
+
+
+def play_game(task):
+    """
+    Plays one complete game.  Runs in a worker process, so it takes and returns only plain data.
+    :param task: Tuple of (game index, seed, white policy spec, black policy spec, maximum plies).
+    :return: GameRecord of the game.
+    """
+    game_index, seed, white_spec, black_spec, max_plies = task
+    rng = random.Random(seed)
+    policies = {'white': make_policy(white_spec, rng), 'black': make_policy(black_spec, rng)}
+    game = ChessVar(backend='bitboard', headless=True)
+    moves = play_out(game, policies, max_plies)
+
+    game_state = game.get_game_state()
+    winner = {'WHITE_WON': 'white', 'BLACK_WON': 'black'}.get(game_state)
+    return GameRecord(game_index, seed, white_spec, black_spec, winner, game_state, len(moves), moves,
+                      game.to_fen())
+
+
+def run_selfplay(games, white='random', black='random', workers=None, seed=0, max_plies=DEFAULT_MAX_PLIES):
+    """
+    Plays games across a pool of worker processes, yielding each GameRecord as soon as its game finishes
+    (so not in game order).  Game number i always uses the same seed for the same base seed.
+    :param games: Number of games to play.
+    :param white: Policy spec for white (see make_policy).
+    :param black: Policy spec for black.
+    :param workers: Number of worker processes; defaults to one per CPU core.
+    :param seed: Base seed the per-game seeds are derived from.
+    :param max_plies: Plies after which an unfinished game is stopped.
+    """
+    tasks = ((index, seed * 1000003 + index, white, black, max_plies) for index in range(games))
+    with multiprocessing.Pool(workers) as pool:
+        for record in pool.imap_unordered(play_game, tasks):
+            yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play batches of atomic chess games between move policies.")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--white', default='random', help="random, search:<depth>, search-nodes:<n>, "
+                                                          "or search-time:<seconds>")
+    parser.add_argument('--black', default='random')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-plies', type=int, default=DEFAULT_MAX_PLIES)
+    parser.add_argument('--output', default=None, help="file to write one JSON game record per line to")
+    args = parser.parse_args()
+
+    output = open(args.output, 'w') if args.output else None
+    results = {'white': 0, 'black': 0, None: 0}
+    start = time.perf_counter()
+    try:
+        for record in run_selfplay(args.games, args.white, args.black, args.workers, args.seed, args.max_plies):
+            results[record.winner] += 1
+            if output is not None:
+                output.write(json.dumps(record._asdict()) + '\n')
+            print("game {:>6}  {:<7} in {:>3} plies".format(
+                record.game_index, record.winner or 'no winner', record.move_count))
+    finally:
+        if output is not None:
+            output.close()
+
+    seconds = time.perf_counter() - start
+    print("White won {}, black won {}, no winner {}  ({:.1f} games/s)".format(
+        results['white'], results['black'], results[None], args.games / seconds if seconds > 0 else 0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: asyncio server hosting many concurrent atomic chess games over a simple line protocol.
+
+import argparse
+import asyncio
+import itertools
+
+from ChessVar import ChessVar, MOVE_OK
+
+# Longest command line accepted from a client, in bytes.
+MAX_LINE_LENGTH = 1024
+
+# A client's responses may queue up to this many bytes before the server stops reading its commands.
+WRITE_BUFFER_LIMIT = 64 * 1024
+
+PROTOCOL_HELP = """Commands (one per line, answered with one line each):
+  NEW [fen]                 create a game, from a FEN position if given -> OK <game id>
+  MOVE <id> <from> <to>     make a move, e.g. MOVE 1 e2 e4 -> OK <game state> <exploded squares or ->
+                            or REJECTED <reason code>
+  STATE <id>                -> OK <game state> <player whose turn it is>
+  BOARD <id>                -> OK <FEN of the position>
+  CLOSE <id>                end a game -> OK
+  QUIT                      close the connection
+Errors are answered with ERR <code>."""
+
+
+class _GameEntry:
+    """
+    A hosted game and the time it was last used.
+    """
+    __slots__ = ('game', 'last_used')
+
+    def __init__(self, game, now):
+        self.game = game
+        self.last_used = now
+
+
+class GameServer:
+    """
+    Hosts many ChessVar games in one process.  Each command runs to completion on the event loop without
+    awaiting anything (a move takes well under a millisecond), so commands are atomic: no two ever work on
+    the same game at once, and no lock is needed.  Games nobody has used for idle_timeout seconds are evicted.
+    """
+
+    def __init__(self, max_games=10000, idle_timeout=600.0, max_connections=1000, backend='bitboard'):
+        """
+        :param max_games: Most games hosted at once; NEW is refused with ERR SERVER_FULL beyond it.
+        :param idle_timeout: Seconds after which an unused game is evicted.
+        :param max_connections: Most clients connected at once; others are refused with ERR SERVER_BUSY.
+        :param backend: ChessVar backend of the hosted games.
+        """
+        self._games = {}
+        self._game_ids = itertools.count(1)
+        self._max_games = max_games
+        self._idle_timeout = idle_timeout
+        self._max_connections = max_connections
+        self._connections = 0
+        self._backend = backend
+        self._game_commands = {
+            'MOVE': self._move,
+            'STATE': self._state,
+            'BOARD': self._board,
+            'CLOSE': self._close,
+        }
+
+    def get_game_count(self):
+        """
+        Returns the number of games currently hosted.
+        """
+        return len(self._games)
+
+    async def execute(self, line):
+        """
+        Runs one protocol command.
+        :param line: Command line without its line ending, e.g. 'MOVE 3 e2 e4'.
+        :return: Response line without its line ending.
+        """
+        words = line.split()
+        if not words:
+            return 'ERR EMPTY_COMMAND'
+
+        command = words[0].upper()
+        if command == 'NEW':
+            return self._new_game(' '.join(words[1:]))
+        if command == 'HELP':
+            return 'OK ' + PROTOCOL_HELP.replace('\n', ' | ')
+
+        handler = self._game_commands.get(command)
+        if handler is None:
+            return 'ERR UNKNOWN_COMMAND'
+        if len(words) < 2:
+            return 'ERR BAD_ARGUMENTS'
+        entry = self._games.get(words[1])
+        if entry is None:
+            return 'ERR NO_SUCH_GAME'
+
+        entry.last_used = asyncio.get_running_loop().time()
+        return handler(words[1], entry.game, words[2:])
+
+    def _new_game(self, fen):
+        """
+        Creates a game from the starting position, or from a FEN position if one is given.
+        """
+        if len(self._games) >= self._max_games:
+            return 'ERR SERVER_FULL'
+        try:
+            game = ChessVar.from_fen(fen, self._backend, headless=True) if fen else ChessVar(self._backend, True)
+        except ValueError:
+            return 'ERR BAD_FEN'
+
+        game_id = str(next(self._game_ids))
+        self._games[game_id] = _GameEntry(game, asyncio.get_running_loop().time())
+        return 'OK ' + game_id
+
+    def _move(self, game_id, game, arguments):
+        if len(arguments) != 2:
+            return 'ERR BAD_ARGUMENTS'
+        result = game.play_move(arguments[0], arguments[1])
+        if result.reason != MOVE_OK:
+            return 'REJECTED ' + result.reason
+        return 'OK ' + result.game_state + ' ' + (','.join(result.exploded_squares) or '-')
+
+    def _state(self, game_id, game, arguments):
+        return 'OK ' + game.get_game_state() + ' ' + game.get_player_turn()
+
+    def _board(self, game_id, game, arguments):
+        return 'OK ' + game.to_fen()
+
+    def _close(self, game_id, game, arguments):
+        del self._games[game_id]
+        return 'OK'
+
+    def evict_idle_games(self):
+        """
+        Removes every game unused for idle_timeout seconds.
+        :return: Number of games evicted.
+        """
+        cutoff = asyncio.get_running_loop().time() - self._idle_timeout
+        idle_ids = [game_id for game_id, entry in self._games.items()
+                    if entry.last_used < cutoff]
+        for game_id in idle_ids:
+            del self._games[game_id]
+        return len(idle_ids)
+
+    async def _evict_periodically(self):
+        while True:
+            await asyncio.sleep(min(60.0, self._idle_timeout / 4))
+            self.evict_idle_games()
+
+    async def _handle_client(self, reader, writer):
+        """
+        Serves one client connection, answering its commands in order.  Waiting for each response to
+        drain before reading the next command means a client which stops reading also stops being served.
+        """
+        if self._connections >= self._max_connections:
+            writer.write(b'ERR SERVER_BUSY\n')
+            writer.close()
+            return
+
+        self._connections += 1
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_LIMIT)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line was longer than MAX_LINE_LENGTH.
+                    writer.write(b'ERR LINE_TOO_LONG\n')
+                    break
+                if not line:
+                    break
+                text = line.decode('ascii', 'replace').strip()
+                if text.upper() == 'QUIT':
+                    break
+                response = await self.execute(text)
+                writer.write(response.encode('ascii') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=7777, unix_path=None, ready=None):
+        """
+        Listens for clients until cancelled.
+        :param host: Address to listen on for TCP clients.
+        :param port: TCP port to listen on.
+        :param unix_path: If given, listen on this Unix socket instead of TCP.
+        :param ready: Optional function called with the listening asyncio server once it is started.
+        """
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self._handle_client, unix_path, limit=MAX_LINE_LENGTH)
+        else:
+            server = await asyncio.start_server(self._handle_client, host, port, limit=MAX_LINE_LENGTH)
+
+        eviction = asyncio.ensure_future(self._evict_periodically())
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            eviction.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many atomic chess games over a line protocol.",
+                                     epilog=PROTOCOL_HELP, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--unix', default=None, help="listen on this Unix socket path instead of TCP")
+    parser.add_argument('--max-games', type=int, default=10000)
+    parser.add_argument('--idle-timeout', type=float, default=600.0, help="seconds before an unused game is evicted")
+    parser.add_argument('--max-connections', type=int, default=1000)
+    parser.add_argument('--backend', choices=['bitboard', 'list'], default='bitboard')
+    args = parser.parse_args()
+
+    server = GameServer(args.max_games, args.idle_timeout, args.max_connections, args.backend)
+    where = args.unix if args.unix else '{}:{}'.format(args.host, args.port)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix,
+                                 ready=lambda _: print("Serving atomic chess games on " + where)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
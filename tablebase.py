@@ -0,0 +1,676 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Retrograde endgame tablebases for atomic chess positions with a few pieces, with memory-mapped probes.
+
+import argparse
+import itertools
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import insort
+from collections import namedtuple
+from functools import lru_cache
+
+from ChessVar import (BISHOP, BLACK, COLOR_NAMES, EXPLOSION_MASKS, KING, KING_ATTACKS, KNIGHT, KNIGHT_ATTACKS,
+                      PAWN, PIECE_NAMES, QUEEN, ROOK, SLIDER_DIRECTIONS, WHITE, ChessVar, piece_targets,
+                      sliding_attacks)
+
+# File layout: a header, then one signed 16-bit value per position index (see position_index).
+#   header: magic, format version, number of pieces, material name (e.g. 'KQvK'), number of values
+HEADER = struct.Struct('<4sHH16sQ')
+VALUE = struct.Struct('<h')
+MAGIC = b'ATTB'
+VERSION = 2
+FILE_SUFFIX = '.atb'
+
+# Values: DRAW (no forced win for either side), +n when the player to move destroys the other King
+# in n plies at best, -n when the player to move loses in n plies at best.
+DRAW = 0
+
+# Order of the piece types of each color within a material name and a position index: King first.
+MATERIAL_ORDER = (KING, QUEEN, ROOK, BISHOP, KNIGHT, PAWN)
+
+# Flags computed for each position by the first pass of the generator.
+_DUPLICATE_FLAG, _HAS_MOVES_FLAG, _SAFE_CAPTURE_FLAG = 1, 2, 4
+
+
+def build_symmetries():
+    """
+    Builds the 8 symmetries of the board as square maps (a tuple giving the image of each square 0-63).
+    The identity and the left/right mirror come first: they are the only ones which keep pawns moving
+    the right way, while atomic chess without pawns plays the same under all 8.
+    """
+    transforms = (lambda row, column: (row, column), lambda row, column: (row, 7 - column),
+                  lambda row, column: (7 - row, column), lambda row, column: (7 - row, 7 - column),
+                  lambda row, column: (column, row), lambda row, column: (column, 7 - row),
+                  lambda row, column: (7 - column, row), lambda row, column: (7 - column, 7 - row))
+    symmetries = []
+    for transform in transforms:
+        images = []
+        for square in range(64):
+            row, column = transform(square // 8, square % 8)
+            images.append(row * 8 + column)
+        symmetries.append(tuple(images))
+    return tuple(symmetries)
+
+
+def build_king_pairs(symmetries):
+    """
+    Numbers the placements of the two Kings which are different under a group of board symmetries.
+    Each placement is represented by the smallest (white King, black King) image of it.
+    :return: Tuple of (list of representative (white King, black King) squares, and a list indexed by
+    white King * 64 + black King giving the number of its representative and the symmetries mapping it there,
+    or None for two Kings on one square).
+    """
+    pairs = sorted({min((symmetry[white_king], symmetry[black_king]) for symmetry in symmetries)
+                    for white_king in range(64) for black_king in range(64) if white_king != black_king})
+    numbers = {pair: number for number, pair in enumerate(pairs)}
+    lookup = []
+    for white_king in range(64):
+        for black_king in range(64):
+            if white_king == black_king:
+                lookup.append(None)
+                continue
+            images = [(symmetry[white_king], symmetry[black_king]) for symmetry in symmetries]
+            pair = min(images)
+            lookup.append((numbers[pair], tuple(symmetry for symmetry, image in zip(symmetries, images)
+                                                if image == pair)))
+    return pairs, lookup
+
+
+SYMMETRIES = build_symmetries()
+
+# King placements for materials without pawns (8 symmetries) and with pawns (left/right mirror only).
+PAWNLESS_KING_PAIRS = build_king_pairs(SYMMETRIES)
+PAWN_KING_PAIRS = build_king_pairs(SYMMETRIES[:2])
+
+
+class TablebaseResult(namedtuple('TablebaseResult', ['result', 'plies'])):
+    """
+    Outcome of a tablebase probe, for the player whose turn it is.
+    result: 'WIN', 'LOSS' or 'DRAW'.
+    plies: Plies until a King is destroyed with best play (0 for a draw).
+    """
+    __slots__ = ()
+
+
+def _piece_sort_key(piece_code):
+    return piece_code // 6, MATERIAL_ORDER.index(piece_code % 6)
+
+
+def parse_material(material):
+    """
+    Reads a material name such as 'KQvK' or 'KRvKN' (white's pieces, 'v', black's pieces).
+    :return: Tuple of piece codes in index order: white's King, white's other pieces, then black's.
+    """
+    white, separator, black = material.upper().partition('V')
+    if not separator:
+        raise ValueError("Material must look like 'KQvK': " + material)
+    codes = []
+    for color, letters in ((WHITE, white), (BLACK, black)):
+        if letters.count('K') != 1 or any(letter not in PIECE_NAMES for letter in letters):
+            raise ValueError("Each side needs exactly one King and pieces from " + ''.join(PIECE_NAMES) + ": " + material)
+        codes.extend(color * 6 + PIECE_NAMES.index(letter) for letter in letters)
+    return tuple(sorted(codes, key=_piece_sort_key))
+
+
+def material_name(codes):
+    """
+    Returns the material name (e.g. 'KQvK') of a collection of piece codes.
+    """
+    codes = sorted(codes, key=_piece_sort_key)
+    white = ''.join(PIECE_NAMES[code % 6] for code in codes if code < 6)
+    black = ''.join(PIECE_NAMES[code % 6] for code in codes if code >= 6)
+    return white + 'v' + black
+
+
+def sub_materials(material):
+    """
+    Lists every material a position of this material can turn into through explosions while both Kings
+    survive (including the material itself), fewest pieces first.
+    """
+    codes = parse_material(material)
+    others = [index for index, code in enumerate(codes) if code % 6 != KING]
+    names = set()
+    for count in range(len(others) + 1):
+        for removed in itertools.combinations(others, count):
+            names.add(material_name([code for index, code in enumerate(codes) if index not in removed]))
+    return sorted(names, key=lambda name: (len(name), name))
+
+
+class TableLayout(namedtuple('TableLayout', ['size', 'pairs', 'pair_lookup', 'king_indices', 'other_indices',
+                                           'radices', 'runs'])):
+    """
+    How the positions of one material are numbered (see position_index).
+    size: Number of position indices.
+    pairs, pair_lookup: King placements, see build_king_pairs.
+    king_indices: Positions of the white and the black King in the material's piece codes.
+    other_indices: Positions of the other pieces in the piece codes, in index order.
+    radices: Number of squares left for each of the other pieces (62, 61, ...).
+    runs: (start, stop) slices of other_indices holding several pieces of the same kind.
+    """
+    __slots__ = ()
+
+
+@lru_cache(maxsize=None)
+def table_layout(codes):
+    """
+    Returns the TableLayout of a material.
+    :param codes: Piece codes as returned by parse_material.
+    """
+    has_pawns = any(code % 6 == PAWN for code in codes)
+    pairs, pair_lookup = PAWN_KING_PAIRS if has_pawns else PAWNLESS_KING_PAIRS
+    king_indices = tuple(index for index, code in enumerate(codes) if code % 6 == KING)
+    other_indices = tuple(index for index, code in enumerate(codes) if code % 6 != KING)
+    radices = tuple(range(62, 62 - len(other_indices), -1))
+    runs = []
+    start = 0
+    for _, group in itertools.groupby(codes[index] for index in other_indices):
+        stop = start + len(list(group))
+        if stop - start > 1:
+            runs.append((start, stop))
+        start = stop
+    size = 2 * len(pairs)
+    for radix in radices:
+        size *= radix
+    return TableLayout(size, pairs, pair_lookup, king_indices, other_indices, radices, tuple(runs))
+
+
+def _canonical_index(layout, squares, side):
+    """
+    Numbers a position through every symmetry which takes its Kings to their representative placement,
+    and keeps the smallest number.
+    :return: Tuple of (index, number of symmetries giving that smallest number, which is the number of
+    symmetries leaving the position unchanged).
+    """
+    white_king, black_king = squares[layout.king_indices[0]], squares[layout.king_indices[1]]
+    pair, symmetries = layout.pair_lookup[white_king * 64 + black_king]
+    best = count = None
+    for symmetry in symmetries:
+        mapped = [symmetry[squares[piece_index]] for piece_index in layout.other_indices]
+        for start, stop in layout.runs:
+            mapped[start:stop] = sorted(mapped[start:stop])
+        occupied = [symmetry[white_king], symmetry[black_king]]
+        index = side * len(layout.pairs) + pair
+        for radix, square in zip(layout.radices, mapped):
+            index = index * radix + square - sum(1 for other in occupied if other < square)
+            occupied.append(square)
+        if best is None or index < best:
+            best, count = index, 1
+        elif index == best:
+            count += 1
+    return best, count
+
+
+def position_index(codes, squares, side):
+    """
+    Returns the index of a position in its material's table.  The Kings' placement is numbered up to the
+    board's symmetries (all 8 without pawns, the left/right mirror with pawns; see build_king_pairs), and each
+    other piece by its square among those still empty, so positions with two pieces on one square or which
+    mirror another have no index of their own.
+    :param codes: Piece codes as returned by parse_material.
+    :param squares: Squares (0-63) of the pieces, in the same order.
+    :param side: Player to move, 0 for white or 1 for black.
+    """
+    return _canonical_index(table_layout(codes), squares, side)[0]
+
+
+def decode_index(index, codes):
+    """
+    Reverses position_index.  Where several placements share an index (symmetric Kings, or pieces of the same
+    kind), one of them is returned.
+    :return: Tuple of (list of squares, side to move).
+    """
+    layout = table_layout(codes)
+    digits = []
+    for radix in reversed(layout.radices):
+        index, digit = divmod(index, radix)
+        digits.append(digit)
+    side, pair = divmod(index, len(layout.pairs))
+
+    squares = [0] * len(codes)
+    squares[layout.king_indices[0]], squares[layout.king_indices[1]] = layout.pairs[pair]
+    occupied = sorted(layout.pairs[pair])
+    for piece_index, square in zip(layout.other_indices, reversed(digits)):
+        for other in occupied:
+            if other <= square:
+                square += 1
+        squares[piece_index] = square
+        insort(occupied, square)
+    return squares, side
+
+
+def canonical_pieces(pieces):
+    """
+    Sorts (square, piece code) pairs into index order.
+    :return: Tuple of (material name, list of squares).
+    """
+    pieces = sorted(pieces, key=lambda piece: (_piece_sort_key(piece[1]), piece[0]))
+    return material_name([code for _, code in pieces]), [square for square, _ in pieces]
+
+
+class TablebaseFile:
+    """
+    One material's table, read through a read-only memory map.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Not a tablebase file: " + path)
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError("Not a tablebase file: " + path)
+        magic, version, self.piece_count, material, self.size = HEADER.unpack_from(self._map, 0)
+        self.material = material.rstrip(b'\0').decode('ascii')
+        if magic != MAGIC or version != VERSION or len(self._map) < HEADER.size + self.size * VALUE.size:
+            self.close()
+            raise ValueError("Not a tablebase file, or an unsupported version: " + path)
+        self.codes = parse_material(self.material)
+
+    def value(self, index):
+        """
+        Returns the stored value of a position index.
+        """
+        return VALUE.unpack_from(self._map, HEADER.size + index * VALUE.size)[0]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class Tablebase:
+    """
+    Probes the tables in a directory.  Each table file is memory-mapped the first time it is needed, so probes
+    cost a dictionary lookup and one read from the page cache, shared by every process using the same files.
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: Directory holding the .atb files written by generate.
+        """
+        self._directory = directory
+        self._tables = {}
+        self.max_pieces = 0
+        if os.path.isdir(directory):
+            for file_name in os.listdir(directory):
+                if file_name.endswith(FILE_SUFFIX):
+                    self.max_pieces = max(self.max_pieces, len(file_name) - len(FILE_SUFFIX) - 1)
+
+    def get_table(self, material):
+        """
+        Returns the TablebaseFile of a material, or None if it hasn't been generated.
+        """
+        table = self._tables.get(material)
+        if table is None:
+            path = os.path.join(self._directory, material + FILE_SUFFIX)
+            if not os.path.exists(path):
+                return None
+            table = self._tables[material] = TablebaseFile(path)
+            self.max_pieces = max(self.max_pieces, table.piece_count)
+        return table
+
+    def probe_value(self, pieces, side):
+        """
+        Looks up the stored value of a position.
+        :param pieces: List of (square, piece code) pairs, both Kings included.
+        :param side: Player to move, 0 for white or 1 for black.
+        :return: The value (see DRAW), or None if there is no table for the material.
+        """
+        material, squares = canonical_pieces(pieces)
+        table = self.get_table(material)
+        if table is None:
+            return None
+        return table.value(position_index(table.codes, squares, side))
+
+    def probe(self, game):
+        """
+        Looks up the position of a ChessVar object.
+        :return: TablebaseResult for the player to move, or None if the game is over or has too many pieces.
+        """
+        if game.get_game_state() != 'UNFINISHED':
+            return None
+        pieces = game.get_piece_list('white') + game.get_piece_list('black')
+        if len(pieces) > self.max_pieces:
+            return None
+        value = self.probe_value(pieces, COLOR_NAMES.index(game.get_player_turn()))
+        if value is None:
+            return None
+        if value > 0:
+            return TablebaseResult('WIN', value)
+        if value < 0:
+            return TablebaseResult('LOSS', -value)
+        return TablebaseResult('DRAW', 0)
+
+    def close(self):
+        for table in self._tables.values():
+            table.close()
+        self._tables = {}
+
+
+def _position_moves(codes, squares, side, tablebase):
+    """
+    Goes through the legal moves of a position the way ChessVar.generate_legal_moves and _execute_move would.
+    Captures are resolved straight away: they end the game or lead to a smaller material's table.
+    :return: Tuple of (number of quiet moves, list of capture values for the player to move).
+    """
+    occupancy = [0, 0]
+    for code, square in zip(codes, squares):
+        occupancy[code // 6] |= 1 << square
+    occupied = occupancy[WHITE] | occupancy[BLACK]
+
+    # Both Kings are always on the board, so captures destroying both of them are ruled out up front.
+    king_squares = [squares[index] for index, code in enumerate(codes) if code % 6 == KING]
+    double_king_zone = ((EXPLOSION_MASKS[king_squares[0]] | 1 << king_squares[0]) &
+                        (EXPLOSION_MASKS[king_squares[1]] | 1 << king_squares[1]))
+
+    quiet_moves = 0
+    capture_values = []
+    for index, (code, square) in enumerate(zip(codes, squares)):
+        if code // 6 != side:
+            continue
+        targets = piece_targets(square, code, occupancy)
+        quiet_moves += bin(targets & ~occupied).count('1')
+        if code % 6 == KING:
+            continue
+
+        captures = targets & occupied & ~double_king_zone
+        while captures:
+            target_bit = captures & -captures
+            captures ^= target_bit
+            target = target_bit.bit_length() - 1
+            blast = EXPLOSION_MASKS[target]
+            survivors = []
+            own_king_destroyed = enemy_king_destroyed = False
+            for other_code, other_square in zip(codes, squares):
+                destroyed = (other_square in (square, target) or
+                             (blast >> other_square & 1 and other_code % 6 != PAWN))
+                if not destroyed:
+                    survivors.append((other_square, other_code))
+                elif other_code % 6 == KING:
+                    if other_code // 6 == side:
+                        own_king_destroyed = True
+                    else:
+                        enemy_king_destroyed = True
+
+            if enemy_king_destroyed:
+                capture_values.append(1)
+            elif own_king_destroyed:
+                capture_values.append(-1)
+            else:
+                # The other player moves next in the smaller material, so their value is turned around.
+                value = tablebase.probe_value(survivors, 1 - side)
+                if value is None:
+                    raise ValueError("Missing table for " + canonical_pieces(survivors)[0])
+                capture_values.append(-(value + 1) if value > 0 else (1 - value if value < 0 else DRAW))
+
+    return quiet_moves, capture_values
+
+
+def _first_pass(task):
+    """
+    Runs the first pass of the generator over a range of position indices, in a worker process.
+    :param task: Tuple of (material, table directory, first index, index after the last).
+    :return: Tuple of (first index, quiet move counts, shortest capture wins, longest capture losses, flags),
+    the last four as bytes of arrays.
+    """
+    material, directory, start, stop = task
+    codes = parse_material(material)
+    layout = table_layout(codes)
+    tablebase = Tablebase(directory)
+    size = stop - start
+    quiet_counts = array('H', bytes(2 * size))
+    capture_wins = array('H', bytes(2 * size))
+    capture_losses = array('H', bytes(2 * size))
+    flags = bytearray(size)
+
+    for offset in range(size):
+        squares, side = decode_index(start + offset, codes)
+        if _canonical_index(layout, squares, side)[0] != start + offset:
+            # Another index stands for the same position; it is copied from there once solved.
+            flags[offset] = _DUPLICATE_FLAG
+            continue
+        quiet_moves, capture_values = _position_moves(codes, squares, side, tablebase)
+        quiet_counts[offset] = quiet_moves
+        if quiet_moves or capture_values:
+            flags[offset] |= _HAS_MOVES_FLAG
+        wins = [value for value in capture_values if value > 0]
+        losses = [-value for value in capture_values if value < 0]
+        if wins:
+            capture_wins[offset] = min(wins)
+        if len(losses) < len(capture_values):
+            flags[offset] |= _SAFE_CAPTURE_FLAG
+        if losses:
+            capture_losses[offset] = max(losses)
+
+    tablebase.close()
+    return start, quiet_counts.tobytes(), capture_wins.tobytes(), capture_losses.tobytes(), bytes(flags)
+
+
+def _unmove_targets(code, square, occupied):
+    """
+    Finds the squares a piece now on square could have come from with a quiet move, given the current occupancy.
+    """
+    piece_type = code % 6
+    empty = ~occupied
+    if piece_type == KNIGHT:
+        return KNIGHT_ATTACKS[square] & empty
+    if piece_type == KING:
+        return KING_ATTACKS[square] & empty
+    if piece_type != PAWN:
+        return sliding_attacks(square, occupied, SLIDER_DIRECTIONS[piece_type]) & empty
+
+    # Pawns step back one square, or two to their starting row when both squares behind are empty.
+    step = -8 if code < 6 else 8
+    single = square + step
+    if not 0 <= single < 64 or occupied >> single & 1:
+        return 0
+    origins = 1 << single
+    double = single + step
+    if (code < 6 and 24 <= square < 32) or (code >= 6 and 32 <= square < 40):
+        if not occupied >> double & 1:
+            origins |= 1 << double
+    return origins
+
+
+def _predecessors(index, codes):
+    """
+    Finds every position from which a quiet move leads to the position at index (or to a mirror image of it).
+    :return: Dictionary from the index of each such position to its number of moves leading there.
+    """
+    layout = table_layout(codes)
+    squares, side = decode_index(index, codes)
+    symmetries = _canonical_index(layout, squares, side)[1]
+    mover = 1 - side
+    occupied = 0
+    for square in squares:
+        occupied |= 1 << square
+
+    # Unmoves reach each mirror image of an earlier position which moves here.  Weighting every image by the
+    # symmetries leaving it unchanged, and dividing by those leaving this position unchanged, counts the moves
+    # of the earlier position itself which lead to an image of this one.
+    weights = {}
+    for piece_index, code in enumerate(codes):
+        if code // 6 != mover:
+            continue
+        origins = _unmove_targets(code, squares[piece_index], occupied)
+        while origins:
+            origin_bit = origins & -origins
+            origins ^= origin_bit
+            previous_squares = list(squares)
+            previous_squares[piece_index] = origin_bit.bit_length() - 1
+            previous, previous_symmetries = _canonical_index(layout, previous_squares, mover)
+            weights[previous] = weights.get(previous, 0) + previous_symmetries
+    return {previous: weight // symmetries for previous, weight in weights.items()}
+
+
+def generate_table(material, directory, pool=None, progress=None):
+    """
+    Solves every position of one material and writes its table.  Tables for every smaller material it can
+    explode into must already be in the directory (generate takes care of the order).
+    First, each position's moves are counted and its captures resolved (spread over the pool's workers).
+    Then positions are settled in order of distance: a position is won in n plies if a quiet move reaches a
+    position lost in n - 1 (or a capture wins in n), and lost in n once every move has been shown to lose,
+    the slowest in n - 1.  Whatever is left unsettled is a draw.  Indices standing for the same position as
+    another (see decode_index) are skipped and take its value at the end.
+    :param pool: multiprocessing.Pool to spread the first pass over, or None to run it here.
+    :param progress: Optional function called with messages about the work.
+    :return: Tuple of (positions won, lost and drawn for the player to move).
+    """
+    codes = parse_material(material)
+    size = table_layout(codes).size
+    chunk = -(-size // 256)
+    tasks = [(material, directory, start, min(start + chunk, size)) for start in range(0, size, chunk)]
+
+    quiet_counts = array('H', bytes(2 * size))
+    capture_wins = array('H', bytes(2 * size))
+    loss_depths = array('H', bytes(2 * size))
+    flags = bytearray(size)
+    results = pool.imap_unordered(_first_pass, tasks) if pool is not None else map(_first_pass, tasks)
+    for start, chunk_quiet, chunk_wins, chunk_losses, chunk_flags in results:
+        stop = start + len(chunk_flags)
+        quiet_counts[start:stop] = array('H', chunk_quiet)
+        capture_wins[start:stop] = array('H', chunk_wins)
+        loss_depths[start:stop] = array('H', chunk_losses)
+        flags[start:stop] = chunk_flags
+    if progress is not None:
+        progress("{}: moves counted for {} positions".format(material, size))
+
+    values = array('h', bytes(2 * size))
+    settled = bytearray(size)
+    win_buckets, loss_buckets = {}, {}
+    for index in range(size):
+        flag = flags[index]
+        if flag & _DUPLICATE_FLAG or not flag & _HAS_MOVES_FLAG:
+            settled[index] = 1
+        else:
+            if capture_wins[index]:
+                win_buckets.setdefault(capture_wins[index], []).append(index)
+            if flag & _SAFE_CAPTURE_FLAG:
+                # A capture which doesn't lose means the position can never be lost.
+                quiet_counts[index] += 1
+            elif quiet_counts[index] == 0:
+                loss_buckets.setdefault(loss_depths[index], []).append(index)
+
+    distance = 1
+    while win_buckets or loss_buckets:
+        for index in win_buckets.pop(distance, ()):
+            if settled[index]:
+                continue
+            settled[index] = 1
+            values[index] = distance
+            for previous, moves in _predecessors(index, codes).items():
+                if not settled[previous]:
+                    quiet_counts[previous] -= moves
+                    if loss_depths[previous] < distance + 1:
+                        loss_depths[previous] = distance + 1
+                    if quiet_counts[previous] == 0:
+                        loss_buckets.setdefault(loss_depths[previous], []).append(previous)
+
+        for index in loss_buckets.pop(distance, ()):
+            if settled[index]:
+                continue
+            settled[index] = 1
+            values[index] = -distance
+            for previous in _predecessors(index, codes):
+                if not settled[previous]:
+                    win_buckets.setdefault(distance + 1, []).append(previous)
+        distance += 1
+
+    wins = losses = draws = 0
+    for index in range(size):
+        if flags[index] & _DUPLICATE_FLAG:
+            continue
+        value = values[index]
+        if value > 0:
+            wins += 1
+        elif value < 0:
+            losses += 1
+        else:
+            draws += 1
+    for index in range(size):
+        if flags[index] & _DUPLICATE_FLAG:
+            squares, side = decode_index(index, codes)
+            values[index] = values[position_index(codes, squares, side)]
+
+    if sys.byteorder != 'little':
+        values.byteswap()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, material + FILE_SUFFIX)
+    with open(path + '.tmp', 'wb') as table_file:
+        table_file.write(HEADER.pack(MAGIC, VERSION, len(codes), material.encode('ascii'), size))
+        table_file.write(values.tobytes())
+    os.replace(path + '.tmp', path)
+
+    if sys.byteorder != 'little':
+        values.byteswap()
+    if progress is not None:
+        progress("{}: {} won, {} lost, {} drawn, longest win {} plies".format(
+            material, wins, losses, draws, max(values)))
+    return wins, losses, draws
+
+
+def generate(materials, directory, workers=None, force=False, progress=None):
+    """
+    Generates the tables of several materials, and of every smaller material they can explode into,
+    smallest first.  Existing tables are kept unless force is True.
+    :param materials: Material names such as 'KQvK'.
+    :param directory: Directory to write the .atb files to.
+    :param workers: Number of worker processes; None uses one per CPU core, 1 runs everything in this process.
+    :param progress: Optional function called with messages about the work.
+    """
+    needed = sorted({name for material in materials for name in sub_materials(material)},
+                    key=lambda name: (len(name), name))
+    pool = multiprocessing.Pool(workers) if workers != 1 else None
+    try:
+        for material in needed:
+            if not force and os.path.exists(os.path.join(directory, material + FILE_SUFFIX)):
+                continue
+            start = time.perf_counter()
+            generate_table(material, directory, pool, progress)
+            if progress is not None:
+                progress("{}: written in {:.1f}s".format(material, time.perf_counter() - start))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate or probe atomic chess endgame tablebases.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    generate_parser = subparsers.add_parser('generate', help="solve materials such as KQvK or KRvKN")
+    generate_parser.add_argument('materials', nargs='+')
+    generate_parser.add_argument('--dir', default='tablebases')
+    generate_parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    generate_parser.add_argument('--force', action='store_true', help="regenerate tables which already exist")
+    probe_parser = subparsers.add_parser('probe', help="look up a FEN position")
+    probe_parser.add_argument('fen')
+    probe_parser.add_argument('--dir', default='tablebases')
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        generate(args.materials, args.dir, args.workers, args.force, progress=print)
+        return 0
+
+    game = ChessVar.from_fen(args.fen, backend='bitboard', headless=True)
+    result = Tablebase(args.dir).probe(game)
+    if result is None:
+        print("Position not in the tablebases.")
+        return 1
+    if result.result == 'DRAW':
+        print("Draw")
+    else:
+        print("{} for {} in {} plies".format(result.result.capitalize(), game.get_player_turn(), result.plies))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
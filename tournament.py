@@ -0,0 +1,343 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Plays tournaments between move policies in parallel, with Elo estimates, SPRT and a resumable log.
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+
+from ChessVar import ChessVar, load_fens, position_to_fen
+from selfplay import DEFAULT_MAX_PLIES, make_policy, play_out
+
+
+class TournamentGame(namedtuple('TournamentGame', ['game_number', 'white', 'black', 'opening', 'result', 'plies',
+                                                   'seed'])):
+    """
+    One finished tournament game, as written to the log.
+    white, black: Policy specs (see selfplay.make_policy) of the two players.
+    opening: FEN string of the starting position, or None for the standard one.
+    result: '1-0', '0-1', or '1/2-1/2' when nobody won (no moves left, or stopped after the maximum plies).
+    """
+    __slots__ = ()
+
+
+class EloEstimate(namedtuple('EloEstimate', ['elo', 'lower', 'upper', 'wins', 'draws', 'losses'])):
+    """
+    Elo difference of a player over an opponent, with a confidence interval, from their results against each other.
+    elo, lower, upper: Estimate and interval bounds; infinite when every game was won or every game was lost.
+    """
+    __slots__ = ()
+
+
+class SprtSettings(namedtuple('SprtSettings', ['elo0', 'elo1', 'alpha', 'beta'])):
+    """
+    Sequential probability ratio test of the first engine against the second.
+    elo0, elo1: Elo difference under the null hypothesis and under the alternative (e.g. 0 and 5).
+    alpha, beta: Chances of accepting the alternative when the null hypothesis holds, and the reverse.
+    """
+    __slots__ = ()
+
+
+class TournamentSummary(namedtuple('TournamentSummary', ['engines', 'pair_results', 'games_played', 'llr',
+                                                         'sprt_result'])):
+    """
+    State of a tournament.
+    pair_results: Dictionary from each pair of engine indices (i, j), i < j, to [wins, draws, losses] of engine i.
+    llr: Log-likelihood ratio of the SPRT so far, or None if no SPRT is run.
+    sprt_result: 'H1' once the alternative is accepted, 'H0' once the null hypothesis is, else None.
+    """
+    __slots__ = ()
+
+
+def score_to_elo(score):
+    """
+    Converts an expected score (0 to 1) into an Elo difference with the logistic model.
+    """
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+def elo_to_score(elo):
+    """
+    Converts an Elo difference into an expected score with the logistic model.
+    """
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def _score_statistics(wins, draws, losses):
+    """
+    Returns the mean score per game and the variance of a single game's score.
+    """
+    games = wins + draws + losses
+    mean = (wins + 0.5 * draws) / games
+    variance = (wins + 0.25 * draws) / games - mean * mean
+    return mean, variance
+
+
+def _two_sided_z(confidence):
+    """
+    Returns z such that a standard normal variable lies between -z and z with probability confidence,
+    found by bisection on math.erf.
+    """
+    low, high = 0.0, 40.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if math.erf(middle / math.sqrt(2)) < confidence:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def estimate_elo(wins, draws, losses, confidence=0.95):
+    """
+    Estimates the Elo difference of a player from its wins, draws and losses against one opponent.
+    :param confidence: Probability covered by the interval, from a normal approximation of the mean score.
+    :return: EloEstimate.
+    """
+    games = wins + draws + losses
+    if not games:
+        return EloEstimate(0.0, -math.inf, math.inf, wins, draws, losses)
+    mean, variance = _score_statistics(wins, draws, losses)
+    margin = _two_sided_z(confidence) * math.sqrt(variance / games)
+    return EloEstimate(score_to_elo(mean), score_to_elo(mean - margin), score_to_elo(mean + margin),
+                       wins, draws, losses)
+
+
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    """
+    Returns the log-likelihood ratio of the alternative (Elo difference elo1) against the null hypothesis
+    (elo0), using the usual normal approximation of the score over a game's three outcomes.
+    """
+    games = wins + draws + losses
+    if not games:
+        return 0.0
+    mean, variance = _score_statistics(wins, draws, losses)
+    if variance <= 0:
+        # Every game ended the same way, so the sample has no spread; assume 0.25 per game instead,
+        # the largest variance a draw-free game's score can have.
+        variance = 0.25
+    score0, score1 = elo_to_score(elo0), elo_to_score(elo1)
+    return games * (score1 - score0) * (2 * mean - score0 - score1) / (2 * variance)
+
+
+def sprt_bounds(alpha, beta):
+    """
+    Returns the (lower, upper) log-likelihood ratio bounds at which the SPRT accepts H0 or H1.
+    """
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+def schedule_game(game_number, engines, openings, seed, max_plies):
+    """
+    Returns the task for one game of a tournament.  Pairings take turns in game pairs: both games of a pair
+    start from the same opening, with colors swapped, and every pairing plays the same openings.
+    :return: Tuple of (game number, seed, white spec, black spec, maximum plies, opening FEN or None).
+    """
+    pairs = list(itertools.combinations(range(len(engines)), 2))
+    pair_number = game_number // 2
+    first, second = pairs[pair_number % len(pairs)]
+    if game_number % 2:
+        first, second = second, first
+    opening = openings[(pair_number // len(pairs)) % len(openings)] if openings else None
+    return game_number, seed * 1000003 + game_number, engines[first], engines[second], max_plies, opening
+
+
+def play_tournament_game(task):
+    """
+    Plays one tournament game.  Runs in a worker process, so it takes and returns only plain data.
+    :param task: Tuple from schedule_game.
+    :return: TournamentGame.
+    """
+    game_number, seed, white_spec, black_spec, max_plies, opening = task
+    rng = random.Random(seed)
+    policies = {'white': make_policy(white_spec, rng), 'black': make_policy(black_spec, rng)}
+    if opening is None:
+        game = ChessVar(backend='bitboard', headless=True)
+    else:
+        game = ChessVar.from_fen(opening, 'bitboard', headless=True)
+    moves = play_out(game, policies, max_plies)
+    result = {'WHITE_WON': '1-0', 'BLACK_WON': '0-1'}.get(game.get_game_state(), '1/2-1/2')
+    return TournamentGame(game_number, white_spec, black_spec, opening, result, len(moves), seed)
+
+
+def read_log(path):
+    """
+    Reads the games already finished from a tournament log (one JSON TournamentGame per line).
+    A line cut short by an interrupted write is ignored.
+    :return: Dictionary of game number to TournamentGame.
+    """
+    games = {}
+    if path is None or not os.path.exists(path):
+        return games
+    with open(path) as log_file:
+        for line in log_file:
+            try:
+                record = TournamentGame(**json.loads(line))
+            except (ValueError, TypeError):
+                continue
+            games[record.game_number] = record
+    return games
+
+
+def _record_result(pair_results, engines, record):
+    """
+    Adds a finished game to the results of its pairing.
+    """
+    white, black = engines.index(record.white), engines.index(record.black)
+    counts = pair_results[(min(white, black), max(white, black))]
+    if record.result == '1/2-1/2':
+        counts[1] += 1
+    elif (record.result == '1-0') == (white < black):
+        counts[0] += 1
+    else:
+        counts[2] += 1
+
+
+def run_tournament(engines, games, log_path=None, openings=None, workers=None, seed=0,
+                   max_plies=DEFAULT_MAX_PLIES, sprt=None, progress=None):
+    """
+    Plays a round robin between move policies across a pool of worker processes.  Every finished game is
+    appended to the log straight away; running the same tournament with the same log again skips the games
+    already in it, so an interrupted tournament picks up where it stopped.
+    :param engines: List of two or more policy specs (see selfplay.make_policy), e.g. ['search-time:0.1', 'random'].
+    :param games: Number of games in the whole tournament.
+    :param log_path: File the results are appended to, or None.
+    :param openings: Optional list of FEN strings to start games from, each played with both colors.
+    :param workers: Number of worker processes; one per CPU core if None.
+    :param seed: Base seed of the per-game seeds.
+    :param max_plies: Plies after which an unfinished game counts as a draw.
+    :param sprt: Optional SprtSettings for a match between two engines; the match stops once it decides.
+    :param progress: Optional function called with each TournamentGame and the TournamentSummary so far.
+    :return: TournamentSummary.
+    """
+    if len(engines) < 2 or len(set(engines)) != len(engines):
+        raise ValueError("A tournament needs two or more different engines")
+    if sprt is not None and len(engines) != 2:
+        raise ValueError("The SPRT compares exactly two engines")
+
+    pair_results = {pair: [0, 0, 0] for pair in itertools.combinations(range(len(engines)), 2)}
+    finished = read_log(log_path)
+    for game_number, record in finished.items():
+        task = schedule_game(game_number, engines, openings, seed, max_plies)
+        if (record.white, record.black, record.opening, record.seed) != (task[2], task[3], task[5], task[1]):
+            raise ValueError("The log {} belongs to a different tournament (game {})".format(log_path, game_number))
+        _record_result(pair_results, engines, record)
+
+    def summarize():
+        llr = sprt_result = None
+        if sprt is not None:
+            llr = sprt_llr(*pair_results[(0, 1)], sprt.elo0, sprt.elo1)
+            lower, upper = sprt_bounds(sprt.alpha, sprt.beta)
+            sprt_result = 'H1' if llr >= upper else ('H0' if llr <= lower else None)
+        games_played = sum(sum(counts) for counts in pair_results.values())
+        return TournamentSummary(engines, pair_results, games_played, llr, sprt_result)
+
+    summary = summarize()
+    if summary.sprt_result is not None:
+        return summary
+    tasks = (schedule_game(game_number, engines, openings, seed, max_plies)
+             for game_number in range(games) if game_number not in finished)
+
+    log_file = None
+    if log_path is not None:
+        log_file = open(log_path, 'a')
+        if log_file.tell():
+            # Start on a fresh line if the last write was interrupted.
+            with open(log_path, 'rb') as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b'\n':
+                    log_file.write('\n')
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        for record in pool.imap_unordered(play_tournament_game, tasks):
+            if log_file is not None:
+                log_file.write(json.dumps(record._asdict()) + '\n')
+                log_file.flush()
+            _record_result(pair_results, engines, record)
+            summary = summarize()
+            if progress is not None:
+                progress(record, summary)
+            if summary.sprt_result is not None:
+                break
+    finally:
+        # Games still being played when the SPRT decides are abandoned.
+        pool.terminate()
+        pool.join()
+        if log_file is not None:
+            log_file.close()
+    return summary
+
+
+def format_summary(summary, confidence=0.95):
+    """
+    Formats the results of every pairing, with Elo estimates, as a table for printing.
+    """
+    lines = []
+    for (first, second), (wins, draws, losses) in summary.pair_results.items():
+        estimate = estimate_elo(wins, draws, losses, confidence)
+        lines.append("{} vs {}: +{} ={} -{}  Elo {:+.1f} [{:+.1f}, {:+.1f}]".format(
+            summary.engines[first], summary.engines[second], wins, draws, losses,
+            estimate.elo, estimate.lower, estimate.upper))
+    if summary.llr is not None:
+        lines.append("SPRT LLR {:.2f}  {}".format(
+            summary.llr, {'H1': 'H1 accepted', 'H0': 'H0 accepted', None: 'undecided'}[summary.sprt_result]))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a tournament between atomic chess move policies.")
+    parser.add_argument('engines', nargs='+', help="policy specs: random, search:<depth>, search-nodes:<n>, "
+                                                   "or search-time:<seconds>")
+    parser.add_argument('--games', type=int, default=1000, help="games in the whole tournament")
+    parser.add_argument('--log', default=None, help="file to append results to; rerun with it to resume")
+    parser.add_argument('--openings', default=None, help="file of FEN positions to start games from")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-plies', type=int, default=DEFAULT_MAX_PLIES)
+    parser.add_argument('--sprt', type=float, nargs=2, metavar=('ELO0', 'ELO1'), default=None,
+                        help="stop a two-engine match once the first engine is shown ELO1 or ELO0 stronger")
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    parser.add_argument('--report-every', type=int, default=10, help="print the standings every this many games")
+    args = parser.parse_args()
+
+    openings = None
+    if args.openings is not None:
+        with open(args.openings) as openings_file:
+            openings = [position_to_fen(position) for position in load_fens(openings_file)]
+    sprt = SprtSettings(args.sprt[0], args.sprt[1], args.alpha, args.beta) if args.sprt else None
+
+    start = time.perf_counter()
+    games_this_run = [0]
+
+    def report(record, summary):
+        games_this_run[0] += 1
+        if summary.games_played % args.report_every == 0:
+            print("After {} games ({:.2f} games/s):\n{}".format(
+                summary.games_played, games_this_run[0] / (time.perf_counter() - start), format_summary(summary)))
+
+    try:
+        summary = run_tournament(args.engines, args.games, args.log, openings, args.workers, args.seed,
+                                 args.max_plies, sprt, report)
+    except ValueError as error:
+        # A log from another tournament, too few engines, an SPRT without exactly two, or an unknown policy spec.
+        print(error, file=sys.stderr)
+        return 1
+    print("Final, {} games:\n{}".format(summary.games_played, format_summary(summary)))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
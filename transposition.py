@@ -0,0 +1,157 @@
+# Author: Colin Sonnenberg
+# GitHub username: sonnenco
+# Description: Bounded transposition table keyed by the Zobrist keys of atomic chess positions.
+
+from array import array
+
+# Rough size of one table entry (the entry list, its key and a compact move list), used to turn the
+# memory cap into a number of slots.
+BYTES_PER_ENTRY = 256
+
+# Bound types for stored search scores.
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+# Positions of the fields inside an entry list.
+_KEY, _GENERATION, _DEPTH, _SCORE, _BOUND, _BEST_MOVE, _MOVES, _EVALUATION = range(8)
+
+
+class TranspositionTable:
+    """
+    Holds search results, legal move lists and evaluations for positions, keyed by ChessVar.get_zobrist_key().
+    Each key maps to one slot.  When two positions want the same slot, the table keeps the deeper search
+    result, but entries left over from an earlier search (see new_search) are always replaced.
+    """
+
+    def __init__(self, max_megabytes=16):
+        """
+        Creates an empty table.
+        :param max_megabytes: Approximate memory cap, which fixes the number of slots.
+        """
+        self._slot_count = max(1, int(max_megabytes * 1024 * 1024) // BYTES_PER_ENTRY)
+        self._slots = [None] * self._slot_count
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        """
+        Returns the number of slots currently holding an entry.
+        """
+        return self._slot_count - self._slots.count(None)
+
+    def get_slot_count(self):
+        """
+        Returns the number of slots allowed by the memory cap.
+        """
+        return self._slot_count
+
+    def get_stats(self):
+        """
+        Returns a dictionary with the number of probe hits and misses since the table was created or cleared.
+        """
+        return {'hits': self._hits, 'misses': self._misses}
+
+    def new_search(self):
+        """
+        Marks every current entry as belonging to an earlier search, so they are the first to be replaced.
+        """
+        self._generation += 1
+
+    def clear(self):
+        """
+        Empties the table.
+        """
+        self._slots = [None] * self._slot_count
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+
+    def _find(self, key):
+        """
+        Returns the entry stored for key, or None, counting the probe as a hit or a miss.
+        """
+        entry = self._slots[key % self._slot_count]
+        if entry is not None and entry[_KEY] == key:
+            self._hits += 1
+            return entry
+        self._misses += 1
+        return None
+
+    def _claim(self, key, depth):
+        """
+        Returns the entry to write for key, replacing the slot's entry when the replacement policy allows it.
+        Returns None when the slot holds a more valuable entry for another position.
+        :param depth: Search depth about to be stored, or -1 for a move list or evaluation.
+        """
+        index = key % self._slot_count
+        entry = self._slots[index]
+        if entry is not None and entry[_KEY] == key:
+            return entry
+        if entry is None or entry[_GENERATION] != self._generation or depth >= entry[_DEPTH]:
+            entry = [key, self._generation, -1, 0, EXACT, None, None, None]
+            self._slots[index] = entry
+            return entry
+        return None
+
+    def store(self, key, depth, score, bound, best_move):
+        """
+        Stores a search result for a position.
+        :param key: Zobrist key of the position.
+        :param depth: Depth (in plies) the position was searched to.
+        :param score: Score from the point of view of the player to move.
+        :param bound: EXACT, LOWER_BOUND or UPPER_BOUND.
+        :param best_move: Encoded best move found, or None.
+        """
+        entry = self._claim(key, depth)
+        if entry is None:
+            return
+        if depth >= entry[_DEPTH] or entry[_GENERATION] != self._generation:
+            entry[_GENERATION] = self._generation
+            entry[_DEPTH] = depth
+            entry[_SCORE] = score
+            entry[_BOUND] = bound
+            entry[_BEST_MOVE] = best_move
+
+    def probe(self, key):
+        """
+        Looks up a search result.
+        :return: Tuple of (depth, score, bound, best_move), or None if no search result is stored.
+        """
+        entry = self._find(key)
+        if entry is None or entry[_DEPTH] < 0:
+            return None
+        return entry[_DEPTH], entry[_SCORE], entry[_BOUND], entry[_BEST_MOVE]
+
+    def store_moves(self, key, moves):
+        """
+        Stores the legal move list of a position (see ChessVar.generate_legal_moves).
+        """
+        entry = self._claim(key, -1)
+        if entry is not None:
+            entry[_MOVES] = array('H', moves)
+
+    def probe_moves(self, key):
+        """
+        Returns the stored legal move list of a position as an array of encoded moves, or None.
+        """
+        entry = self._find(key)
+        if entry is None:
+            return None
+        return entry[_MOVES]
+
+    def store_evaluation(self, key, evaluation):
+        """
+        Stores the static evaluation of a position.
+        """
+        entry = self._claim(key, -1)
+        if entry is not None:
+            entry[_EVALUATION] = evaluation
+
+    def probe_evaluation(self, key):
+        """
+        Returns the stored static evaluation of a position, or None.
+        """
+        entry = self._find(key)
+        if entry is None:
+            return None
+        return entry[_EVALUATION]